@@ -8,6 +8,7 @@ entrypoints (`run_ambiguous_step_inference`, `verify_state_transition`) and
 
 from __future__ import annotations
 
+import functools
 import logging
 import os
 import time
@@ -38,6 +39,12 @@ logger = logging.getLogger(__name__)
 AgentSignal = Literal["finished", "calluser"]
 
 
+@functools.lru_cache(maxsize=8)
+def _genai_client(api_key: str) -> genai.Client:
+    """Shared client per API key so every step reuses one HTTP connection pool."""
+    return genai.Client(api_key=api_key)
+
+
 def _inference_thread_id(
     workflow_id: str | None,
     run_id: str | None,
@@ -324,7 +331,7 @@ async def run_ambiguous_step_inference_langgraph(
             return False, "", "", None, "Could not parse action from model output (retry)"
         parsed = merge_type_text_at_workflow_literal(step_data, parsed, typing_override=typing_override)
 
-    client = genai.Client(api_key=api_key or os.environ.get("GEMINI_API_KEY", ""))
+    client = _genai_client(api_key or os.environ.get("GEMINI_API_KEY", ""))
     parsed, _loc = await resolve_coords_for_action(
         parsed,
         screenshot_bytes,
@@ -112,6 +112,9 @@ HISTORY_ROLLING_STEPS = 5
 HISTORY_CONTEXT_SLICE_CHARS = 120
 JSON_ERROR_LOG_TRUNCATE_CHARS = 500
 MEDIA_SYNTHESIS_TEMPERATURE = 0.2
+SYNTHESIS_GENERATE_MAX_CONCURRENCY = 8
+SYNTHESIS_GENERATE_MAX_ATTEMPTS = 5
+SYNTHESIS_GENERATE_BACKOFF_MAX_S = 30.0
 
 # --- Voice / LiveKit -----------------------------------------------------------
 DEFAULT_AGENT_BACKEND_URL = "http://localhost:8083"
@@ -13,10 +13,13 @@ import asyncio
 import hashlib
 import json
 import logging
+import os
+import random
 import re
 import uuid
-from typing import Any
+from typing import Any, Literal
 
+import orjson
 from echo_prism_agent.constants import (
     FRAME_CHANGE_THRESHOLD_DEFAULT,
     FRAME_PIXEL_DIFF_SAMPLE_BYTES,
@@ -28,6 +31,9 @@ from echo_prism_agent.constants import (
     SYNTHESIS_FRAME_MAX_OUTPUT_TOKENS,
     SYNTHESIS_FRAME_REQUEST_TIMEOUT_S,
     SYNTHESIS_FRAME_TEMPERATURE,
+    SYNTHESIS_GENERATE_BACKOFF_MAX_S,
+    SYNTHESIS_GENERATE_MAX_ATTEMPTS,
+    SYNTHESIS_GENERATE_MAX_CONCURRENCY,
     TITLE_CONTEXT_SLICE_CHARS,
     TITLE_GENERATION_TIMEOUT_S,
     TITLE_MAX_OUTPUT_TOKENS,
@@ -41,10 +47,67 @@ from echo_prism_agent.model_prompts import (
 )
 from echo_prism_agent.models_config import SYNTHESIS_MODEL
 from echo_prism_agent.ui_tars.screenshot_pipeline import compress_screenshot
+from pydantic import BaseModel, ConfigDict, ValidationError, field_validator
 
 logger = logging.getLogger(__name__)
 
 
+class _SynthesizedStep(BaseModel):
+    # Open model: any other fields the model emits must survive.
+    model_config = ConfigDict(extra="allow")
+
+    action: str = "wait"
+    context: str = ""
+    params: dict[str, Any] = {}
+    expected_outcome: str = ""
+    # Declared (not just allowed as extras) so constrained decoding can emit them; unset ones are not dumped.
+    frame_image_url: str | None = None
+    click_overlay: dict[str, Any] | None = None
+    context_attachments: list[dict[str, Any]] | None = None
+
+    @field_validator("action", "context", "params", "expected_outcome", mode="before")
+    @classmethod
+    def _null_as_default(cls, value: Any, info: Any) -> Any:
+        # Models sometimes emit explicit nulls for optional fields; treat them as omitted.
+        if value is None:
+            return cls.model_fields[info.field_name].get_default(call_default_factory=True)
+        # Free-text fields are coerced rather than rejected so one odd value doesn't drop the whole step.
+        if info.field_name in ("context", "expected_outcome") and not isinstance(value, str):
+            return str(value)
+        return value
+
+    @field_validator("frame_image_url", "click_overlay", "context_attachments", mode="before")
+    @classmethod
+    def _drop_mistyped_media(cls, value: Any, info: Any) -> Any:
+        # Best-effort media hints: a wrong-typed value is ignored rather than dropping the step.
+        expected = {"frame_image_url": str, "click_overlay": dict, "context_attachments": list}[info.field_name]
+        if info.field_name == "context_attachments" and isinstance(value, list):
+            return [item for item in value if isinstance(item, dict)]
+        return value if isinstance(value, expected) else None
+
+
+_STEP_MEDIA_FIELDS = ("frame_image_url", "click_overlay", "context_attachments")
+
+
+class _SynthesizedWorkflow(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    title: str = ""
+    workflow_type: Literal["browser", "desktop"] = "browser"
+    steps: list[_SynthesizedStep] = []
+
+
+# Process-wide cap on in-flight one-shot synthesis calls; bursts queue here instead of tripping 429s.
+_GENERATE_SEM = asyncio.Semaphore(
+    max(1, int(os.environ.get("ECHOPRISM_SYNTHESIS_CONCURRENCY", "") or SYNTHESIS_GENERATE_MAX_CONCURRENCY))
+)
+_RETRYABLE_STATUS_CODES = frozenset({429, 503})
+
+# Passed as response_json_schema (not response_schema): the Developer API rejects free-form
+# `params` objects in Schema form, but accepts them in JSON Schema.
+_WORKFLOW_JSON_SCHEMA = _SynthesizedWorkflow.model_json_schema()
+
+
 def _frame_hash(data: bytes) -> str:
     """MD5 hash for fast change detection."""
     return hashlib.md5(data).hexdigest()
@@ -147,13 +210,15 @@ VISUAL_KEYFRAME_ACTIONS = frozenset(a.lower().replace("_", "") for a in _COMPOSE
 )
 
 _KEYFRAME_PNG_LEAF = re.compile(r"^image_(\d+)\.png$", re.I)
+_ATTACHMENT_REF_LABEL = re.compile(r"c(\d+)", re.I)  # use with fullmatch
+_VARIABLE_TOKEN = re.compile(r"\{\{(\w+)\}\}")
 
 
 def _max_attachment_c_index(attachments: list[dict]) -> int:
     m = 0
     for a in attachments:
         rl = str(a.get("ref_label") or "").strip()
-        mm = re.fullmatch(r"c(\d+)", rl, re.I)
+        mm = _ATTACHMENT_REF_LABEL.fullmatch(rl)
         if mm:
             m = max(m, int(mm.group(1)))
     return m
@@ -197,7 +262,7 @@ def link_frame_url_to_context_attachments(step: dict) -> dict:
     for a in attachments:
         if str(a.get("url") or "").strip() == fiu:
             rl = str(a.get("ref_label") or "").strip()
-            if re.fullmatch(r"c\d+", rl, re.I):
+            if _ATTACHMENT_REF_LABEL.fullmatch(rl):
                 ref = rl.lower()
             else:
                 n = _max_attachment_c_index(attachments) + 1
@@ -338,6 +403,30 @@ def spread_collapsed_synthesis_keyframes(steps: list[dict], *, hi: int) -> None:
         steps[si] = link_frame_url_to_context_attachments(step)
 
 
+_COORD_KEYS = frozenset(("x", "y", "x1", "y1", "x2", "y2"))
+_TYPE_TEXT_DROPPED_COORD_KEYS = _COORD_KEYS - {"x", "y"}  # type_text_at with text keeps its x/y
+
+
+def _collect_variables(text: str, variables: set[str]) -> None:
+    if "{{" not in text:
+        return
+    for m in _VARIABLE_TOKEN.findall(text):
+        if not _ATTACHMENT_REF_LABEL.fullmatch(m):
+            variables.add(m)
+
+
+def _freeze(value: Any) -> Any:
+    """
+    Hashable, key-order-independent form of JSON-like params (the consecutive-step dedup key).
+    Values are tagged with their type so True / 1 / 1.0 (equal and same-hash in Python) stay distinct.
+    """
+    if isinstance(value, dict):
+        return ("dict", tuple(sorted((k, _freeze(v)) for k, v in value.items())))
+    if isinstance(value, list):
+        return ("list", tuple(_freeze(v) for v in value))
+    return (type(value).__name__, value)
+
+
 def _postprocess_steps(steps_data: list[dict]) -> tuple[list[dict], set[str]]:
     """
     Strip legacy coordinate keys, deduplicate, extract {{variables}}. No bogus coord defaults.
@@ -351,29 +440,31 @@ def _postprocess_steps(steps_data: list[dict]) -> tuple[list[dict], set[str]]:
     variables: set[str] = set()
     processed_steps: list[dict] = []
     prev_key: tuple | None = None
-    coord_keys = ("x", "y", "x1", "y1", "x2", "y2")
-    for s in steps_data:
-        params = dict(s.get("params", {}))
-        action = (s.get("action") or "").lower().replace("_", "")
-        text_hint = str(params.get("text") or params.get("content") or "").strip()
-        preserve_xy_typetext = action == "typetextat" and bool(text_hint)
-        for ck in coord_keys:
-            if preserve_xy_typetext and ck in ("x", "y"):
+    for raw in steps_data:
+        # Validate once into the typed step (defaults filled, extras kept) instead of per-field .get()s.
+        try:
+            step = _SynthesizedStep.model_validate(raw)
+        except ValidationError as e:
+            logger.warning("Dropping malformed synthesized step: %s", e.errors(include_url=False, include_input=False))
+            continue
+        action = step.action.lower().replace("_", "")
+        text_hint = str(step.params.get("text") or step.params.get("content") or "").strip()
+        dropped = _TYPE_TEXT_DROPPED_COORD_KEYS if action == "typetextat" and text_hint else _COORD_KEYS
+        # One pass: copy params minus coordinates, collecting {{variables}} from string values.
+        params = {}
+        for k, val in step.params.items():
+            if k in dropped:
                 continue
-            params.pop(ck, None)
-        for val in list(params.values()) + [s.get("context", "")]:
+            params[k] = val
             if isinstance(val, str):
-                for m in re.findall(r"\{\{(\w+)\}\}", val):
-                    if re.fullmatch(r"c\d+", m, re.I):
-                        continue
-                    variables.add(m)
-        step_key = (s.get("action", ""), json.dumps(params, sort_keys=True))
+                _collect_variables(val, variables)
+        _collect_variables(step.context, variables)
+        step_key = (step.action, _freeze(params))
         if step_key == prev_key:
             continue
         prev_key = step_key
-        s_copy = dict(s)
-        s_copy["params"] = params
-        processed_steps.append(s_copy)
+        step.params = params
+        processed_steps.append(step.model_dump(exclude={f for f in _STEP_MEDIA_FIELDS if getattr(step, f) is None}))
     linked = [link_frame_url_to_context_attachments(st) for st in processed_steps]
     return linked, variables
 
@@ -433,7 +524,7 @@ async def synthesize_frame_step(
                             raw += p.text
         if not raw:
             return None, None, "Empty response"
-        data = json.loads(raw)
+        data = orjson.loads(raw)
         wf_type = data.get("workflow_type")
         if isinstance(wf_type, str):
             wf_type = wf_type.strip() or None
@@ -505,6 +596,94 @@ async def _generate_title_from_steps(
         return None
 
 
+async def _generate_content(client: Any, **kwargs: Any) -> Any:
+    """``generate_content`` in a worker thread, bounded by ``_GENERATE_SEM``; 429/503 retry with jittered backoff."""
+    from google.genai import errors as genai_errors
+
+    attempt = 1
+    while True:
+        try:
+            async with _GENERATE_SEM:
+                return await asyncio.to_thread(client.models.generate_content, **kwargs)
+        except genai_errors.APIError as e:
+            if e.code not in _RETRYABLE_STATUS_CODES or attempt >= SYNTHESIS_GENERATE_MAX_ATTEMPTS:
+                raise
+            # Sleep outside the semaphore so a backing-off call doesn't hold a slot.
+            delay = min(SYNTHESIS_GENERATE_BACKOFF_MAX_S, 2 ** (attempt - 1) + random.uniform(0, 1))
+            logger.warning("generate_content %s (attempt %d); retrying in %.1fs", e.code, attempt, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+def _first_json_object(text: str) -> str | None:
+    """Substring from the first ``{`` to its matching ``}``, skipping braces inside JSON strings.
+
+    Recovers the object from markdown fences or prose wrappers ("Here is the JSON: …").
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start : i + 1]
+    return None
+
+
+def _response_json(response: Any, label: str) -> Any:
+    """Decoded JSON body of a schema-constrained response, or None when it cannot be parsed.
+
+    Uses ``response.parsed`` when the SDK already decoded it; otherwise parses the text, falling
+    back to the first balanced ``{…}`` when it is wrapped in markdown fences or prose.
+    """
+    parsed = getattr(response, "parsed", None)
+    if isinstance(parsed, dict):
+        return parsed
+
+    raw = response.text if hasattr(response, "text") and response.text else ""
+    if not raw and response.candidates:
+        for c in response.candidates:
+            if c.content and c.content.parts:
+                for p in c.content.parts:
+                    if hasattr(p, "text") and p.text:
+                        raw += p.text
+    raw = raw.strip()
+
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so the handlers are unchanged.
+    try:
+        return orjson.loads(raw)
+    except json.JSONDecodeError as e:
+        fragment = _first_json_object(raw)
+        if fragment:
+            try:
+                return orjson.loads(fragment)
+            except json.JSONDecodeError:
+                pass
+        logger.warning(
+            "%s JSON parse failed: %s. Raw (truncated): %s",
+            label,
+            e,
+            raw[:JSON_ERROR_LOG_TRUNCATE_CHARS],
+        )
+        return None
+
+
 async def synthesize_workflow_from_media(
     client: Any,
     parts: list[Any],
@@ -529,9 +708,11 @@ async def synthesize_workflow_from_media(
             "You may reference them in `frame_image_url` or `context_attachments[].url` as relative filenames "
             "(e.g. `image_0.png`) inside that prefix, or as full `gs://…` / `https://` URLs."
         )
+        # Static prompt first: Gemini's implicit context cache only matches a shared request prefix,
+        # and the per-workflow storage note would otherwise make every prefix unique.
         user_parts = [
-            gtypes.Part.from_text(text=prefix_note),
             gtypes.Part.from_text(text=MEDIA_SYNTHESIS_PROMPT),
+            gtypes.Part.from_text(text=prefix_note),
             *parts,
         ]
     else:
@@ -539,60 +720,20 @@ async def synthesize_workflow_from_media(
     contents = [gtypes.Content(role="user", parts=user_parts)]
     config = gtypes.GenerateContentConfig(
         response_mime_type="application/json",
+        response_json_schema=_WORKFLOW_JSON_SCHEMA,
         temperature=MEDIA_SYNTHESIS_TEMPERATURE,
     )
 
-    response = await asyncio.to_thread(
-        client.models.generate_content,
-        model=model,
-        contents=contents,
-        config=config,
-    )
-
-    raw = response.text if hasattr(response, "text") and response.text else ""
-    if not raw and response.candidates:
-        for c in response.candidates:
-            if c.content and c.content.parts:
-                for p in c.content.parts:
-                    if hasattr(p, "text") and p.text:
-                        raw += p.text
-    raw = re.sub(r"^```(?:json)?\s*", "", raw.strip(), flags=re.MULTILINE)
-    raw = re.sub(r"\s*```\s*$", "", raw.strip(), flags=re.MULTILINE)
-    raw = raw.strip()
-
-    try:
-        data = json.loads(raw)
-    except json.JSONDecodeError as e:
-        m = re.search(r"\{[\s\S]*\}", raw)
-        extracted = m.group(0) if m else None
-        if extracted:
-            try:
-                data = json.loads(extracted)
-            except json.JSONDecodeError:
-                logger.warning(
-                    "Media synthesis JSON parse failed: %s. Raw (truncated): %s",
-                    e,
-                    raw[:JSON_ERROR_LOG_TRUNCATE_CHARS],
-                )
-                return {
-                    "title": "Untitled",
-                    "workflow_type": "browser",
-                    "steps": [],
-                    "variables": [],
-                }
-        else:
-            logger.warning(
-                "Media synthesis JSON parse failed: %s. Raw (truncated): %s",
-                e,
-                raw[:JSON_ERROR_LOG_TRUNCATE_CHARS],
-            )
-            return {
-                "title": "Untitled",
-                "workflow_type": "browser",
-                "steps": [],
-                "variables": [],
-            }
+    response = await _generate_content(client, model=model, contents=contents, config=config)
 
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        logger.debug(
+            "Media synthesis tokens: prompt=%s cached=%s",
+            getattr(usage, "prompt_token_count", None),
+            getattr(usage, "cached_content_token_count", None),
+        )
+    data = _response_json(response, "Media synthesis")
     if not isinstance(data, dict):
         return {
             "title": "Untitled",
@@ -698,50 +839,13 @@ async def synthesize_workflow_from_description(
     contents = [gtypes.Content(role="user", parts=[gtypes.Part.from_text(text=prompt)])]
     config = gtypes.GenerateContentConfig(
         response_mime_type="application/json",
+        response_json_schema=_WORKFLOW_JSON_SCHEMA,
         temperature=MEDIA_SYNTHESIS_TEMPERATURE,
     )
 
-    response = await asyncio.to_thread(
-        client.models.generate_content,
-        model=model,
-        contents=contents,
-        config=config,
-    )
-
-    raw = response.text if hasattr(response, "text") and response.text else ""
-    if not raw and response.candidates:
-        for c in response.candidates:
-            if c.content and c.content.parts:
-                for p in c.content.parts:
-                    if hasattr(p, "text") and p.text:
-                        raw += p.text
-    raw = re.sub(r"^```(?:json)?\s*", "", raw.strip(), flags=re.MULTILINE)
-    raw = re.sub(r"\s*```\s*$", "", raw.strip(), flags=re.MULTILINE)
-    raw = raw.strip()
-
-    try:
-        data = json.loads(raw)
-    except json.JSONDecodeError as e:
-        m = re.search(r"\{[\s\S]*\}", raw)
-        extracted = m.group(0) if m else None
-        if extracted:
-            try:
-                data = json.loads(extracted)
-            except json.JSONDecodeError:
-                logger.warning(
-                    "Description synthesis JSON parse failed: %s. Raw (truncated): %s",
-                    e,
-                    raw[:JSON_ERROR_LOG_TRUNCATE_CHARS],
-                )
-                return {"title": name, "workflow_type": workflow_type, "steps": [], "variables": []}
-        else:
-            logger.warning(
-                "Description synthesis JSON parse failed: %s. Raw (truncated): %s",
-                e,
-                raw[:JSON_ERROR_LOG_TRUNCATE_CHARS],
-            )
-            return {"title": name, "workflow_type": workflow_type, "steps": [], "variables": []}
+    response = await _generate_content(client, model=model, contents=contents, config=config)
 
+    data = _response_json(response, "Description synthesis")
     if not isinstance(data, dict):
         return {"title": name, "workflow_type": workflow_type, "steps": [], "variables": []}
     steps_raw = data.get("steps") if isinstance(data.get("steps"), list) else []
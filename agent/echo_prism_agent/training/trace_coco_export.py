@@ -14,6 +14,7 @@ import re
 from typing import Any
 
 from echo_prism_agent.training.datasets.coco4gui_builder import COCO4GUIBuilder
+from google.cloud.firestore import FieldFilter
 
 logger = logging.getLogger(__name__)
 
@@ -59,13 +60,8 @@ def export_run_to_coco(
     bucket = bucket_name or os.environ.get("ECHO_GCS_BUCKET")
     gcs_base = f"gs://{bucket}" if bucket else ""
 
-    logs_ref = run_ref.collection("logs")
-    trace_logs: list[dict] = []
-    for d in logs_ref.stream():
-        doc = d.to_dict() or {}
-        if doc.get("trace") is True:
-            trace_logs.append(doc)
-    trace_logs.sort(key=lambda x: x.get("step_index", 0))
+    logs_query = run_ref.collection("logs").where(filter=FieldFilter("trace", "==", True)).order_by("step_index")
+    trace_logs = [d.to_dict() or {} for d in logs_query.stream()]
 
     doc_id = f"{workflow_id}_{run_id}"
     ft_ref = db.collection("filtered_traces").document(doc_id)
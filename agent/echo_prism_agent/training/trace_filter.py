@@ -26,10 +26,12 @@ import asyncio
 import logging
 import os
 import re
+from collections import Counter
 from typing import Any
 
 from echo_prism_agent.constants import DEFAULT_TRACE_SCORING_MODEL, WAIT_EXCESS_THRESHOLD_SECONDS
 from echo_prism_agent.model_prompts import TRACE_SCORING_PROMPT as _SCORING_PROMPT
+from google.cloud.firestore import FieldFilter
 
 logger = logging.getLogger(__name__)
 
@@ -183,17 +185,14 @@ async def score_trace(
     """
     key = api_key or os.environ.get("GEMINI_API_KEY", "")
 
-    # Fetch all trace log entries (only those with trace=True)
-    logs_ref = run_ref.collection("logs")
-    trace_docs = [{"id": d.id, **d.to_dict()} for d in logs_ref.stream() if d.to_dict().get("trace") is True]
+    # Fetch trace log entries (trace=True) already sorted by step_index (composite index on logs)
+    logs_query = run_ref.collection("logs").where(filter=FieldFilter("trace", "==", True)).order_by("step_index")
+    trace_docs = [{"id": d.id, **d.to_dict()} for d in logs_query.stream()]
 
     if not trace_docs:
         logger.info("No trace entries found for run %s", run_id)
         return []
 
-    # Sort by step_index
-    trace_docs.sort(key=lambda x: x.get("step_index", 0))
-
     # Pass 1: rule-based
     scored = _rule_pass(trace_docs)
 
@@ -231,6 +230,7 @@ async def score_trace(
     # Store in filtered_traces collection using batch writes
     from google.cloud.firestore import SERVER_TIMESTAMP
 
+    quality_counts = Counter(e["quality"] for e in scored)
     doc_id = f"{workflow_id}_{run_id}"
     ft_ref = db.collection("filtered_traces").document(doc_id)
     ft_ref.set(
@@ -239,8 +239,8 @@ async def score_trace(
             "run_id": run_id,
             "owner_uid": owner_uid,
             "step_count": len(scored),
-            "good_count": sum(1 for e in scored if e["quality"] == "good"),
-            "bad_count": sum(1 for e in scored if e["quality"] == "bad"),
+            "good_count": quality_counts["good"],
+            "bad_count": quality_counts["bad"],
             "scored_at": SERVER_TIMESTAMP,
         },
         merge=True,
@@ -280,7 +280,11 @@ async def score_trace(
         batch.set(step_ref, step_data)
     batch.commit()
 
-    good = sum(1 for e in scored if e["quality"] == "good")
-    bad = sum(1 for e in scored if e["quality"] == "bad")
-    logger.info("Trace scored for run %s: %d good, %d bad out of %d", run_id, good, bad, len(scored))
+    logger.info(
+        "Trace scored for run %s: %d good, %d bad out of %d",
+        run_id,
+        quality_counts["good"],
+        quality_counts["bad"],
+        len(scored),
+    )
     return scored
@@ -17,10 +17,16 @@ Global model architecture (UI-TARS style):
   All users automatically benefit from the improved model on their next run.
 """
 
+import asyncio
 import io
+import itertools
 import json
 import logging
 import os
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import Future
 from typing import Any
 
 logger = logging.getLogger(__name__)
@@ -110,6 +116,37 @@ def _build_multimodal_example(step: dict, workflow_name: str) -> dict | None:
     }
 
 
+# Resumable-upload chunk size (multiple of 256 KiB); bounds export memory regardless of dataset size.
+_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class _LineStream(io.RawIOBase):
+    """Forward-only byte stream over an iterator of lines, so an upload pulls rows as it sends them."""
+
+    def __init__(self, lines: Iterator[bytes]) -> None:
+        self._lines = lines
+        self._pending = b""
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def readinto(self, buf: Any) -> int:
+        while not self._pending:
+            line = next(self._lines, None)
+            if line is None:
+                return 0
+            self._pending = line
+        n = min(len(buf), len(self._pending))
+        buf[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        self._pos += n
+        return n
+
+
 async def export_training_data(
     db: Any,
     output_gcs_path: str,
@@ -122,40 +159,6 @@ async def export_training_data(
     Returns count of training examples written.
     Raises ValueError if too few examples to submit a tuning job.
     """
-    # Fetch all filtered_trace documents across all users (global dataset)
-    ft_query = db.collection("filtered_traces").stream()
-    ft_docs = list(ft_query)
-
-    examples: list[dict] = []
-
-    for ft_doc in ft_docs:
-        ft_data = ft_doc.to_dict() or {}
-        workflow_id = ft_data.get("workflow_id", "unknown")
-        workflow_name = ft_data.get("workflow_name") or f"Workflow {workflow_id[:8]}"
-
-        # Fetch steps subcollection
-        steps_ref = ft_doc.reference.collection("steps")
-        for step_doc in steps_ref.stream():
-            step = step_doc.to_dict() or {}
-            # Prefer multimodal when screenshot_url available
-            example = _build_multimodal_example(step, workflow_name) or _build_training_example(step, workflow_name)
-            if example:
-                examples.append(example)
-
-    logger.info("Built %d training examples from %d trace documents", len(examples), len(ft_docs))
-
-    if not examples:
-        raise ValueError("No training examples found. Run more workflows to build trace data.")
-
-    # Build JSONL bytes
-    jsonl_bytes = io.BytesIO()
-    for ex in examples:
-        jsonl_bytes.write((json.dumps(ex) + "\n").encode("utf-8"))
-    jsonl_bytes.seek(0)
-
-    # Upload to GCS
-    _bucket_name = bucket_name or os.environ.get("ECHO_GCS_BUCKET")
-
     # output_gcs_path is like "training/{uid}/dataset.jsonl" or "gs://bucket/prefix/object.jsonl"
     target_bucket: str | None = None
     if output_gcs_path.startswith("gs://"):
@@ -168,23 +171,52 @@ async def export_training_data(
     else:
         blob_name = output_gcs_path
 
-    upload_bucket = target_bucket or _bucket_name
+    upload_bucket = target_bucket or bucket_name or os.environ.get("ECHO_GCS_BUCKET")
     if not upload_bucket:
         raise ValueError("ECHO_GCS_BUCKET environment variable not set (or provide gs://bucket/... path)")
 
-    try:
+    # Fetch all filtered_trace documents across all users (global dataset); steps are streamed per trace.
+    ft_docs = await asyncio.to_thread(lambda: list(db.collection("filtered_traces").stream()))
+    n_examples = 0
+
+    def example_lines() -> Iterator[bytes]:
+        nonlocal n_examples
+        for ft_doc in ft_docs:
+            ft_data = ft_doc.to_dict() or {}
+            workflow_id = ft_data.get("workflow_id", "unknown")
+            workflow_name = ft_data.get("workflow_name") or f"Workflow {workflow_id[:8]}"
+
+            for step_doc in ft_doc.reference.collection("steps").stream():
+                step = step_doc.to_dict() or {}
+                # Prefer multimodal when screenshot_url available
+                example = _build_multimodal_example(step, workflow_name) or _build_training_example(step, workflow_name)
+                if example:
+                    n_examples += 1
+                    yield (json.dumps(example) + "\n").encode("utf-8")
+
+    # Examples are encoded and uploaded as they are built, so memory stays at one upload chunk instead of
+    # the whole dataset. Peek first so an empty export fails before any object is created.
+    lines = example_lines()
+    first_line = await asyncio.to_thread(next, lines, None)
+    if first_line is None:
+        raise ValueError("No training examples found. Run more workflows to build trace data.")
+
+    def upload() -> None:
         from google.cloud import storage
 
-        gcs_client = storage.Client()
-        bucket = gcs_client.bucket(upload_bucket)
-        blob = bucket.blob(blob_name)
-        blob.upload_from_file(jsonl_bytes, content_type="application/jsonl")
-        gcs_uri = f"gs://{upload_bucket}/{blob_name}"
-        logger.info("Uploaded %d training examples to %s", len(examples), gcs_uri)
+        blob = storage.Client().bucket(upload_bucket).blob(blob_name, chunk_size=_UPLOAD_CHUNK_SIZE)
+        stream = io.BufferedReader(_LineStream(itertools.chain([first_line], lines)))
+        # Unsized stream -> resumable upload; an error mid-stream abandons it without finalizing the object.
+        blob.upload_from_file(stream, content_type="application/jsonl")
+
+    try:
+        await asyncio.to_thread(upload)
     except Exception as e:
         raise RuntimeError(f"GCS upload failed: {e}") from e
 
-    return len(examples)
+    gcs_uri = f"gs://{upload_bucket}/{blob_name}"
+    logger.info("Uploaded %d training examples from %d trace documents to %s", n_examples, len(ft_docs), gcs_uri)
+    return n_examples
 
 
 async def create_tuning_job(
@@ -269,18 +301,56 @@ async def create_tuning_job(
         raise RuntimeError(f"Vertex AI tuning job submission failed: {e}") from e
 
 
+# The tuning job is global, so every client polling it asks about the same job; share one Vertex RPC per TTL.
+_TUNING_STATUS_TTL_S = 30.0
+_TERMINAL_TUNING_STATES = ("JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED")
+_tuning_status_cache: dict[tuple[str, str | None, str], tuple[float, dict]] = {}
+_tuning_status_inflight: dict[tuple[str, str | None, str], Future[dict]] = {}
+_tuning_status_lock = threading.Lock()
+
+
 def get_tuning_job_status(job_name: str, project: str | None = None, location: str = "us-central1") -> dict:
     """
     Check the current status of a Vertex AI SupervisedTuningJob.
     Returns a dict with keys: state, tuned_model_endpoint_name (if completed).
+
+    Results are cached for ``_TUNING_STATUS_TTL_S`` (terminal states for good) and concurrent callers
+    for the same job wait on one in-flight lookup, so many pollers cost one Vertex call per TTL.
+    The lock only guards the cache; the lookup itself runs outside it so other jobs are not blocked.
     """
     _project = project or os.environ.get("ECHO_GCP_PROJECT_ID")
-
+    key = (job_name, _project, location)
+    with _tuning_status_lock:
+        cached = _tuning_status_cache.get(key)
+        if cached is not None and time.monotonic() < cached[0]:
+            return dict(cached[1])
+        inflight = _tuning_status_inflight.get(key)
+        if inflight is None:
+            future: Future[dict] = Future()
+            _tuning_status_inflight[key] = future
+    if inflight is not None:
+        return dict(inflight.result())
+    try:
+        status = _fetch_tuning_job_status(job_name, _project, location)
+    except BaseException as e:
+        with _tuning_status_lock:
+            del _tuning_status_inflight[key]
+        future.set_exception(e)
+        raise
+    terminal = status["state"].endswith(_TERMINAL_TUNING_STATES)
+    with _tuning_status_lock:
+        _tuning_status_cache[key] = (float("inf") if terminal else time.monotonic() + _TUNING_STATUS_TTL_S, status)
+        del _tuning_status_inflight[key]
+    future.set_result(status)
+    return dict(status)
+
+
+def _fetch_tuning_job_status(job_name: str, project: str | None, location: str) -> dict:
     try:
         import vertexai
         from vertexai.tuning import sft as vertex_sft
 
-        vertexai.init(project=_project, location=location)
+        vertexai.init(project=project, location=location)
         job = vertex_sft.SupervisedTuningJob(job_name)
         state = str(job.state) if job.state else "UNKNOWN"
         tuned_model_endpoint = getattr(job, "tuned_model_endpoint_name", None)
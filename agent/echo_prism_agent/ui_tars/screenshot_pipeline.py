@@ -355,7 +355,7 @@ def _bgr_frame_to_jpeg_bytes(frame: Any) -> bytes | None:
 
 
 def extract_frames_from_video(
-    content: bytes,
+    content: bytes | str | os.PathLike[str],
     mime: str,
     max_frames: int = 120,
     fps_sample: float | None = None,
@@ -365,7 +365,7 @@ def extract_frames_from_video(
     Extract frames from a video file and return as list of JPEG bytes.
 
     Args:
-        content: Raw video bytes.
+        content: Raw video bytes, or the path of a video already on disk (read in place, not deleted).
         mime: MIME type (video/mp4, video/webm, etc.).
         max_frames: Maximum number of frames to extract.
         fps_sample: Sample at this many frames per second. Default 1.0.
@@ -390,17 +390,21 @@ def extract_frames_from_video(
     elif "quicktime" in mime or "mov" in mime:
         suffix = ".mov"
 
+    owns_file = isinstance(content, bytes)
+    if owns_file:
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
+            f.write(content)
+            path = f.name
+    else:
+        path = os.fspath(content)
+
     logger.info(
         "extract_frames_from_video: content_size=%d bytes, mime=%s, suffix=%s",
-        len(content),
+        os.path.getsize(path),
         mime,
         suffix,
     )
 
-    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
-        f.write(content)
-        path = f.name
-
     frames: list[bytes] = []
     try:
         cap = cv2.VideoCapture(path)
@@ -488,7 +492,8 @@ def extract_frames_from_video(
 
         cap.release()
     finally:
-        Path(path).unlink(missing_ok=True)
+        if owns_file:
+            Path(path).unlink(missing_ok=True)
 
     logger.info("extract_frames_from_video: %d frames", len(frames))
     return frames
@@ -12,12 +12,16 @@ import base64
 import json
 import logging
 import os
-import sys
-from pathlib import Path
 from typing import Any
 
 import firebase_admin
 from app.auth import get_firebase_app
+from echo_prism_agent.execution.operator import (
+    get_step_screenshot_bytes,
+    is_deterministic,
+    step_to_action,
+    upload_step_screenshot,
+)
 from echo_prism_agent.run_logging import run_log_prefix
 from echo_prism_agent.ws_errors import (
     CONFIG,
@@ -52,13 +56,6 @@ def _interrupt_payload(intr: Any) -> Any:
     return getattr(first, "value", first)
 
 
-def _ensure_agent_path() -> None:
-    """Ensure agent service root is on sys.path so `echo_prism_agent` imports resolve."""
-    root = Path(__file__).resolve().parent.parent
-    if root.exists() and str(root) not in sys.path:
-        sys.path.insert(0, str(root))
-
-
 def _verify_token(token: str | None) -> str | None:
     if not token:
         return None
@@ -132,8 +129,6 @@ def _update_log_screenshot(db, workflow_id: str, run_id: str, step_index: int, s
 def _upload_and_update_log_screenshot(db, workflow_id: str, run_id: str, step_index: int, after_bytes: bytes) -> None:
     """Upload step screenshot to GCS and set screenshot_url on the matching log entry (called in a thread)."""
     try:
-        from echo_prism_agent.execution.operator import upload_step_screenshot
-
         url = upload_step_screenshot(workflow_id, run_id, step_index, after_bytes)
         if url:
             _update_log_screenshot(db, workflow_id, run_id, step_index, url)
@@ -162,13 +157,6 @@ async def get_step_screenshot(
     ok = await _validate_run_access(uid, workflow_id, run_id)
     if not ok:
         raise HTTPException(status_code=404, detail="Run not found")
-    root = Path(__file__).resolve().parent.parent
-    if str(root) not in sys.path:
-        sys.path.insert(0, str(root))
-    try:
-        from echo_prism_agent.execution.operator import get_step_screenshot_bytes
-    except ImportError:
-        raise HTTPException(status_code=503, detail="Screenshot storage not available")
     data = get_step_screenshot_bytes(workflow_id, run_id, step_index)
     if not data:
         raise HTTPException(status_code=404, detail="Screenshot not found")
@@ -195,15 +183,11 @@ async def agent_run_ws(
 
     await websocket.accept()
 
-    _ensure_agent_path()
+    # Deferred: pulls in LangGraph, which the screenshot routes and cold start don't need.
     from echo_prism_agent.agent import (
         run_ambiguous_step_inference,
         verify_state_transition,
     )
-    from echo_prism_agent.execution.operator import (
-        is_deterministic,
-        step_to_action,
-    )
 
     if not (os.environ.get("OPENROUTER_API_KEY") or "").strip():
         await websocket.send_json(
@@ -7,19 +7,31 @@ Workflow JSON may include ``api_call`` steps; Composio slug + arguments referenc
 """
 
 import asyncio
+import functools
+import io
 import logging
 import os
 import re
-import sys
+import shutil
 import tempfile
 import uuid
 from pathlib import Path
+from types import MappingProxyType
+from typing import BinaryIO
 
 import firebase_admin.firestore
 from app.auth import get_current_uid, get_firebase_app
 from app.config import GCS_BUCKET, GEMINI_API_KEY
+from app.services.gcs import copy_blob as gcs_copy_blob
+from app.services.gcs import delete_file, generate_signed_read_url, upload_file, upload_fileobj
 from app.services.gcs import download_file as gcs_download_file
-from app.services.gcs import generate_signed_read_url, upload_file
+from app.services.gcs import download_to_filename as gcs_download_to_filename
+from echo_prism_agent.synthesis.pipeline import (
+    spread_collapsed_synthesis_keyframes,
+    synthesize_workflow_from_description,
+    synthesize_workflow_from_media,
+)
+from echo_prism_agent.ui_tars.screenshot_pipeline import _normalize_bgr_frame_for_swscale, extract_frames_from_video
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
 from google import genai
 from google.cloud.firestore import SERVER_TIMESTAMP
@@ -30,6 +42,45 @@ router = APIRouter(prefix="/synthesize", tags=["synthesis"])
 _log = logging.getLogger(__name__)
 
 _GS_URI_RE = re.compile(r"^gs://[^/]+/(.+)$")
+_FILES_POLL_INITIAL_S = 0.1  # small images usually go ACTIVE within ~100 ms
+_FILES_POLL_MAX_S = 10.0
+# Caps concurrent Files API uploads across requests (screenshot fan-out would otherwise trip rate limits).
+_FILES_UPLOAD_SEM = asyncio.Semaphore(max(1, int(os.environ.get("ECHOPRISM_GEMINI_UPLOAD_CONCURRENCY", "8") or 8)))
+_IMAGE_MIME_BY_EXT = MappingProxyType(
+    {"png": "image/png", "jpg": "image/jpeg", "jpeg": "image/jpeg", "webp": "image/webp"}
+)
+_VIDEO_MIME_BY_EXT = MappingProxyType(
+    {
+        "mp4": "video/mp4",
+        "webm": "video/webm",
+        "mov": "video/quicktime",
+        "quicktime": "video/quicktime",
+    }
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _db():
+    return firebase_admin.firestore.client(get_firebase_app())
+
+
+# GOOGLE_GENAI_USE_VERTEXAI=true (with GOOGLE_CLOUD_PROJECT / GOOGLE_CLOUD_LOCATION) runs Gemini on Vertex AI,
+# which reads gs:// media in place; the Developer API (API key) only sees Files API uploads.
+_USE_VERTEXAI = os.environ.get("GOOGLE_GENAI_USE_VERTEXAI", "").strip().lower() in ("1", "true", "yes")
+
+
+@functools.lru_cache(maxsize=1)
+def _genai_client() -> genai.Client:
+    """Process-wide Gemini client so uploads and generation share one HTTP connection pool."""
+    if _USE_VERTEXAI:
+        return genai.Client(vertexai=True)
+    return genai.Client(api_key=GEMINI_API_KEY)
+
+
+def _media_mime(content_type: str | None, default: str) -> str:
+    """MIME type to declare to Gemini: the client's image/video type (parameters stripped), else ``default``."""
+    ct = (content_type or "").split(";", 1)[0].strip().lower()
+    return ct if ct.startswith(("image/", "video/")) else default
 
 
 def _blob_from_gs_uri(uri: str) -> str | None:
@@ -168,8 +219,6 @@ def _video_synthesis_max_image_index(steps: list[dict], *, uploaded_max_index: i
 
 
 def _delete_extra_video_keyframes(gcs_prefix: str, *, keep_last_index: int, total_uploaded: int) -> None:
-    from app.services.gcs import delete_file
-
     if keep_last_index >= total_uploaded - 1:
         return
     for i in range(keep_last_index + 1, total_uploaded):
@@ -249,18 +298,37 @@ def _step_firestore_payload(order: int, s: dict) -> dict:
     return payload
 
 
-def _ensure_agent_path() -> None:
-    """Ensure agent service root is on sys.path so `echo_prism_agent` imports resolve."""
-    root = Path(__file__).resolve().parent.parent
-    if root.exists() and str(root) not in sys.path:
-        sys.path.insert(0, str(root))
+# Firestore caps a WriteBatch at 500 operations.
+_FIRESTORE_BATCH_LIMIT = 500
+
+
+def _commit_steps_and_workflow_update(
+    db, workflow_ref, steps: list[dict], folder_prefix: str, workflow_update: dict
+) -> None:
+    """Hydrate steps and write them in batched commits instead of one RPC per step.
+
+    The workflow update rides in the last batch, committed after every earlier batch, so
+    ``status: ready`` never lands ahead of its steps.
+    """
+    steps_col = workflow_ref.collection("steps")
+    batch = db.batch()
+    n_ops = 0
+    for i, s in enumerate(steps):
+        # document() with no id gets a client-side Firestore auto-ID.
+        batch.set(steps_col.document(), _step_firestore_payload(i, _hydrate_step_dict(s, folder_prefix)))
+        n_ops += 1
+        if n_ops == _FIRESTORE_BATCH_LIMIT:
+            batch.commit()
+            batch = db.batch()
+            n_ops = 0
+    batch.update(workflow_ref, workflow_update)
+    batch.commit()
 
 
 def _jpeg_bytes_to_png_bytes(jpeg: bytes) -> bytes:
     """Faster than Pillow for BGR→PNG; input is JPEG from OpenCV extract."""
     import cv2
     import numpy as np
-    from echo_prism_agent.ui_tars.screenshot_pipeline import _normalize_bgr_frame_for_swscale
 
     arr = np.frombuffer(jpeg, dtype=np.uint8)
     bgr = cv2.imdecode(arr, cv2.IMREAD_COLOR)
@@ -275,14 +343,11 @@ def _jpeg_bytes_to_png_bytes(jpeg: bytes) -> bytes:
     return buf.tobytes()
 
 
-def _extract_and_upload_video_keyframes(content: bytes, mime: str, gcs_prefix: str) -> int:
+def _extract_and_upload_video_keyframes(content: bytes | str, mime: str, gcs_prefix: str) -> int:
     """
     Sample frames from the recording, upload as ``image_0.png`` … so step context URLs exist
     (video-only synthesis previously had no ``image_*`` objects under ``gcs_prefix``).
     """
-    _ensure_agent_path()
-    from echo_prism_agent.ui_tars.screenshot_pipeline import extract_frames_from_video
-
     max_f = int(os.environ.get("ECHOPRISM_SYNTHESIS_VIDEO_MAX_FRAMES", "24") or 24)
     max_f = max(1, min(max_f, 120))
     fps_sample = float(os.environ.get("ECHOPRISM_SYNTHESIS_VIDEO_FPS_SAMPLE", "0.6") or 0.6)
@@ -301,7 +366,7 @@ def _extract_and_upload_video_keyframes(content: bytes, mime: str, gcs_prefix: s
         return 0
 
     if not frames:
-        _log.warning("video keyframe extraction produced 0 frames (mime=%s, bytes=%d)", mime, len(content))
+        _log.warning("video keyframe extraction produced 0 frames (mime=%s)", mime)
         return 0
 
     uploaded = 0
@@ -316,35 +381,65 @@ def _extract_and_upload_video_keyframes(content: bytes, mime: str, gcs_prefix: s
     return uploaded
 
 
+def _spool_to_disk(src: BinaryIO, suffix: str) -> str:
+    """Copy an upload stream to a named temp file in 1 MiB chunks; the caller deletes it."""
+    src.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
+        shutil.copyfileobj(src, f, 1 << 20)
+        return f.name
+
+
+def _upload_path_to_gcs(blob_name: str, path: str, content_type: str) -> str:
+    with open(path, "rb") as f:
+        return upload_fileobj(blob_name, f, content_type)
+
+
 async def _upload_to_gemini(
-    content: bytes,
+    client: genai.Client,
+    content: bytes | str,
     mime_type: str,
     *,
     max_wait_seconds: int = 300,
 ) -> types.Part:
-    """Upload file to Gemini Files API and return Part for generate_content."""
-    client = genai.Client(api_key=GEMINI_API_KEY)
-    with tempfile.NamedTemporaryFile(suffix=".bin", delete=False) as f:
-        f.write(content)
-        path = f.name
-    try:
-        uploaded = client.files.upload(file=path, config=types.UploadFileConfig(mime_type=mime_type))
-        loop = asyncio.get_running_loop()
-        deadline = loop.time() + max_wait_seconds
-        while getattr(uploaded.state, "name", str(uploaded.state)) == "PROCESSING":
-            if loop.time() >= deadline:
-                raise TimeoutError(
-                    f"Gemini file upload still processing after {max_wait_seconds}s (name={uploaded.name!r})"
-                )
-            await asyncio.sleep(1)
-            uploaded = client.files.get(name=uploaded.name)
-        state_name = getattr(uploaded.state, "name", str(uploaded.state))
-        if state_name != "ACTIVE":
-            raise ValueError(f"File upload failed: {state_name}")
-        uri = getattr(uploaded, "uri", None) or uploaded.name
-        return types.Part.from_uri(file_uri=uri, mime_type=mime_type)
-    finally:
-        Path(path).unlink(missing_ok=True)
+    """Upload bytes or a file path to Gemini Files API and return Part for generate_content.
+
+    Blocking SDK calls run in worker threads so concurrent uploads overlap instead of stalling the loop.
+    """
+    # The Files API takes a path or a seekable binary stream, so bytes go up straight from memory.
+    media = io.BytesIO(content) if isinstance(content, bytes) else content
+    async with _FILES_UPLOAD_SEM:
+        uploaded = await asyncio.to_thread(
+            client.files.upload, file=media, config=types.UploadFileConfig(mime_type=mime_type)
+        )
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_wait_seconds
+    delay = _FILES_POLL_INITIAL_S
+    while getattr(uploaded.state, "name", str(uploaded.state)) == "PROCESSING":
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise TimeoutError(
+                f"Gemini file upload still processing after {max_wait_seconds}s (name={uploaded.name!r})"
+            )
+        # Back off so long-processing videos don't hit files.get every second.
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * 2, _FILES_POLL_MAX_S)
+        uploaded = await asyncio.to_thread(client.files.get, name=uploaded.name)
+    state_name = getattr(uploaded.state, "name", str(uploaded.state))
+    if state_name != "ACTIVE":
+        raise ValueError(f"File upload failed: {state_name}")
+    uri = getattr(uploaded, "uri", None) or uploaded.name
+    return types.Part.from_uri(file_uri=uri, mime_type=mime_type)
+
+
+def _gcs_part(blob_name: str, mime_type: str) -> types.Part:
+    return types.Part.from_uri(file_uri=f"gs://{GCS_BUCKET}/{blob_name}", mime_type=mime_type)
+
+
+async def _media_part(client: genai.Client, blob_name: str, content: bytes | str, mime_type: str) -> types.Part:
+    """Part for media stored at ``blob_name``: referenced in place on Vertex AI, else copied via the Files API."""
+    if client.vertexai:
+        return _gcs_part(blob_name, mime_type)
+    return await _upload_to_gemini(client, content, mime_type)
 
 
 @router.post("")
@@ -354,14 +449,17 @@ async def synthesize(
     video_gcs_path: str | None = Form(None),
     workflow_name: str | None = Form(None),
     screenshots: list[UploadFile] = File(default=[]),
+    screenshot_gcs_paths: list[str] = Form(default=[]),
 ):
     """Create workflow from video or screenshots via Gemini 2.5 Pro.
 
     Video can be supplied either as a direct upload (``video`` field) **or** as
     a pre-uploaded GCS path (``video_gcs_path``).  The latter avoids the Cloud
-    Run 32 MB request-body limit for large video files.
+    Run 32 MB request-body limit for large video files.  Screenshots likewise
+    accept ``screenshot_gcs_paths`` (from ``/storage/signed-upload-urls``), in
+    step order.
     """
-    if not GEMINI_API_KEY:
+    if not GEMINI_API_KEY and not _USE_VERTEXAI:
         raise HTTPException(status_code=500, detail="GEMINI_API_KEY not configured")
     if not GCS_BUCKET:
         raise HTTPException(
@@ -370,33 +468,41 @@ async def synthesize(
         )
 
     has_video = bool(video or video_gcs_path)
+    has_screenshots = bool(screenshots or screenshot_gcs_paths)
+    # Sorted once: image_{i} order for uploads and the source id both come from this list.
+    sorted_screenshots = sorted(screenshots, key=lambda f: f.filename or "")
     workflow_id = str(uuid.uuid4())
     _source_recording_id: str | None = None
     if video_gcs_path:
         _source_recording_id = video_gcs_path.rsplit("/", 1)[-1] if "/" in video_gcs_path else video_gcs_path
     elif video:
         _source_recording_id = video.filename or "video"
-    elif screenshots:
-        _sorted_ss = sorted(screenshots, key=lambda f: f.filename or "")
-        _source_recording_id = _sorted_ss[0].filename if _sorted_ss else "screenshots"
+    elif sorted_screenshots:
+        _source_recording_id = sorted_screenshots[0].filename or "screenshots"
+    elif screenshot_gcs_paths:
+        _source_recording_id = screenshot_gcs_paths[0].rsplit("/", 1)[-1]
 
-    if has_video and screenshots:
+    if has_video and has_screenshots:
         raise HTTPException(status_code=400, detail="Provide either video or screenshots, not both")
-    if not has_video and not screenshots:
+    if not has_video and not has_screenshots:
         raise HTTPException(status_code=400, detail="Provide video or screenshots")
+    if screenshots and screenshot_gcs_paths:
+        raise HTTPException(status_code=400, detail="Provide either screenshots or screenshot_gcs_paths, not both")
+    screenshot_blobs = [_blob_from_gs_uri(p) for p in screenshot_gcs_paths]
+    if any(b is None or not b.startswith(f"uploads/{uid}/") for b in screenshot_blobs):
+        raise HTTPException(status_code=400, detail="Invalid screenshot_gcs_paths")
 
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
-
+    db = _db()
     workflow_ref = db.collection("workflows").document(workflow_id)
-    workflow_ref.set(
+    await asyncio.to_thread(
+        workflow_ref.set,
         {
             "owner_uid": uid,
             "name": workflow_name or "Processing…",
             "status": "processing",
             "createdAt": SERVER_TIMESTAMP,
             "updatedAt": SERVER_TIMESTAMP,
-        }
+        },
     )
 
     try:
@@ -404,70 +510,108 @@ async def synthesize(
         max_screenshot_index = -1
         video_keyframe_upload_count = 0
         parts: list[types.Part] = []
-        mime_map = {
-            "video/mp4": "video/mp4",
-            "image/png": "image/png",
-            "image/jpeg": "image/jpeg",
-            "image/webp": "image/webp",
-        }
+        client = _genai_client()
 
         if video:
-            content = await video.read()
             ct = video.content_type or "video/mp4"
-            blob_name = f"{gcs_prefix}/{video.filename or 'video.mp4'}"
-            upload_file(blob_name, content, ct)
-            mime = mime_map.get(ct, "video/mp4")
-            part, n_key = await asyncio.gather(
-                _upload_to_gemini(content, mime),
-                asyncio.to_thread(_extract_and_upload_video_keyframes, content, mime, gcs_prefix),
-            )
+            filename = video.filename or "video.mp4"
+            blob_name = f"{gcs_prefix}/{filename}"
+            mime = _media_mime(ct, "video/mp4")
+            # Spool to one file on disk that GCS, Gemini and frame extraction all read; the video
+            # is never held in memory as bytes.
+            path = await asyncio.to_thread(_spool_to_disk, video.file, Path(filename).suffix or ".mp4")
+            try:
+                part, n_key, _ = await asyncio.gather(
+                    _media_part(client, blob_name, path, mime),
+                    asyncio.to_thread(_extract_and_upload_video_keyframes, path, mime, gcs_prefix),
+                    asyncio.to_thread(_upload_path_to_gcs, blob_name, path, ct),
+                )
+            finally:
+                Path(path).unlink(missing_ok=True)
             parts.append(part)
             video_keyframe_upload_count = n_key
             if n_key > 0:
                 max_screenshot_index = n_key - 1
         elif video_gcs_path:
-            match = re.match(r"gs://[^/]+/(.+)", video_gcs_path)
-            if not match:
+            blob_name = _blob_from_gs_uri(video_gcs_path)
+            if not blob_name:
                 raise HTTPException(status_code=400, detail="Invalid video_gcs_path format")
-            blob_name = match.group(1)
+            if not video_gcs_path.strip().startswith(f"gs://{GCS_BUCKET}/"):
+                raise HTTPException(status_code=400, detail="video_gcs_path must be in the Echo upload bucket")
+            if not blob_name.startswith(f"uploads/{uid}/"):
+                raise HTTPException(status_code=403, detail="video_gcs_path must be one of your uploads")
             ext = blob_name.rsplit(".", 1)[-1].lower() if "." in blob_name else ""
-            ct = {
-                "mp4": "video/mp4",
-                "webm": "video/webm",
-                "mov": "video/quicktime",
-                "quicktime": "video/quicktime",
-            }.get(ext, "video/mp4")
-            content = gcs_download_file(blob_name)
+            mime = _VIDEO_MIME_BY_EXT.get(ext, "video/mp4")
             dest_blob = f"{gcs_prefix}/{blob_name.rsplit('/', 1)[-1]}"
-            upload_file(dest_blob, content, ct)
-            mime = mime_map.get(ct, "video/mp4")
-            part, n_key = await asyncio.gather(
-                _upload_to_gemini(content, mime),
-                asyncio.to_thread(_extract_and_upload_video_keyframes, content, mime, gcs_prefix),
-            )
+            fd, path = tempfile.mkstemp(suffix=f".{ext or 'mp4'}")
+            os.close(fd)
+
+            async def _ingest_local_copy() -> tuple[types.Part, int]:
+                # Only Gemini and frame extraction need the bytes; stream them to disk once.
+                await asyncio.to_thread(gcs_download_to_filename, blob_name, path)
+                part, n_key = await asyncio.gather(
+                    _media_part(client, blob_name, path, mime),
+                    asyncio.to_thread(_extract_and_upload_video_keyframes, path, mime, gcs_prefix),
+                )
+                return part, n_key
+
+            try:
+                # The workflow-scoped archive is a server-side copy and runs alongside the download.
+                (part, n_key), _ = await asyncio.gather(
+                    _ingest_local_copy(),
+                    asyncio.to_thread(gcs_copy_blob, blob_name, dest_blob),
+                )
+            finally:
+                Path(path).unlink(missing_ok=True)
             parts.append(part)
             video_keyframe_upload_count = n_key
             if n_key > 0:
                 max_screenshot_index = n_key - 1
+        elif screenshot_blobs:
+            max_screenshot_index = len(screenshot_blobs) - 1
+
+            async def _ingest_gcs_screenshot(i: int, blob_name: str) -> types.Part:
+                ext = blob_name.rsplit(".", 1)[-1].lower() if "." in blob_name else ""
+                mime = _IMAGE_MIME_BY_EXT.get(ext, "image/png")
+                # Already in the bucket: server-side copy to the image_{i}.png key instead of re-uploading.
+                dest_blob = f"{gcs_prefix}/image_{i}.png"
+                if client.vertexai:
+                    await asyncio.to_thread(gcs_copy_blob, blob_name, dest_blob)
+                    return _gcs_part(blob_name, mime)
+
+                async def _download_and_upload() -> types.Part:
+                    content = await asyncio.to_thread(gcs_download_file, blob_name)
+                    return await _upload_to_gemini(client, content, mime)
+
+                part, _ = await asyncio.gather(
+                    _download_and_upload(),
+                    asyncio.to_thread(gcs_copy_blob, blob_name, dest_blob),
+                )
+                return part
+
+            parts.extend(await asyncio.gather(*(_ingest_gcs_screenshot(i, b) for i, b in enumerate(screenshot_blobs))))
         else:
-            sorted_screenshots = sorted(screenshots, key=lambda f: f.filename or "")
             max_screenshot_index = len(sorted_screenshots) - 1
-            for i, f in enumerate(sorted_screenshots):
+
+            async def _upload_screenshot(i: int, f: UploadFile) -> types.Part:
                 content = await f.read()
                 ct = f.content_type or "image/png"
                 # Always image_0.png, image_1.png, … — synthesis prompts tell the model to use those names;
                 # using the browser filename would store a different key than the model emits (404 on read).
                 blob_name = f"{gcs_prefix}/image_{i}.png"
-                upload_file(blob_name, content, ct)
-                mime = mime_map.get(ct, "image/png")
-                part = await _upload_to_gemini(content, mime)
-                parts.append(part)
+                # Independent uploads of the same bytes; both finish before synthesis reads either copy.
+                _, part = await asyncio.gather(
+                    asyncio.to_thread(upload_file, blob_name, content, ct),
+                    _media_part(client, blob_name, content, _media_mime(ct, "image/png")),
+                )
+                return part
+
+            # Fan out so total upload time tracks the slowest screenshot, not the sum; gather keeps order.
+            parts.extend(await asyncio.gather(*(_upload_screenshot(i, f) for i, f in enumerate(sorted_screenshots))))
 
         if not parts:
             raise HTTPException(status_code=400, detail="No media to process")
 
-        _ensure_agent_path()
-        client = genai.Client(api_key=GEMINI_API_KEY)
         if os.environ.get("ECHOPRISM_SYNTHESIS_LANGGRAPH", "1").lower() in (
             "1",
             "true",
@@ -477,8 +621,6 @@ async def synthesize(
 
             result = await synthesize_via_langgraph(client, parts, gcs_prefix=gcs_prefix)
         else:
-            from echo_prism_agent.synthesis.pipeline import synthesize_workflow_from_media
-
             result = await synthesize_workflow_from_media(client, parts, storage_prefix=gcs_prefix)
         steps_raw = result.get("steps")
         if not isinstance(steps_raw, list):
@@ -492,13 +634,14 @@ async def synthesize(
                 "valid JSON, or the Gemini API key / quota failed. Check agent logs (look for "
                 "'Media synthesis JSON parse' or generate_content errors) and try again."
             )
-            workflow_ref.update(
+            await asyncio.to_thread(
+                workflow_ref.update,
                 {
                     "status": "failed",
                     "name": workflow_name or "Synthesis failed",
                     "error": detail,
                     "updatedAt": SERVER_TIMESTAMP,
-                }
+                },
             )
             raise HTTPException(status_code=500, detail=detail)
 
@@ -515,7 +658,8 @@ async def synthesize(
                         cap_hi,
                         n_steps,
                     )
-                    _delete_extra_video_keyframes(
+                    await asyncio.to_thread(
+                        _delete_extra_video_keyframes,
                         gcs_prefix,
                         keep_last_index=cap_hi,
                         total_uploaded=video_keyframe_upload_count,
@@ -525,26 +669,17 @@ async def synthesize(
             else:
                 _clamp_synthesis_image_refs_in_steps(steps_data, hi=max_screenshot_index)
 
-            from echo_prism_agent.synthesis.pipeline import spread_collapsed_synthesis_keyframes
-
             spread_collapsed_synthesis_keyframes(steps_data, hi=max_screenshot_index)
 
-        for i, s in enumerate(steps_data):
-            step_id = str(uuid.uuid4())
-            hydrated = _hydrate_step_dict(s, gcs_prefix)
-            workflow_ref.collection("steps").document(step_id).set(_step_firestore_payload(i, hydrated))
-
         title = workflow_name or result.get("title") or "Untitled workflow"
         workflow_type = result.get("workflow_type", "browser")
         if workflow_type not in ("browser", "desktop"):
             workflow_type = "browser"
 
-        from app.config import GCS_BUCKET as _GCS_BUCKET
-
         thumbnail_gcs_path: str | None = None
-        if (not has_video and screenshots) or (has_video and max_screenshot_index >= 0):
+        if (not has_video and has_screenshots) or (has_video and max_screenshot_index >= 0):
             blob_name_thumb = f"{gcs_prefix}/image_0.png"
-            thumbnail_gcs_path = f"gs://{_GCS_BUCKET}/{blob_name_thumb}"
+            thumbnail_gcs_path = f"gs://{GCS_BUCKET}/{blob_name_thumb}"
 
         update_payload: dict = {
             "name": title,
@@ -559,17 +694,21 @@ async def synthesize(
             update_payload["thumbnail_gcs_path"] = thumbnail_gcs_path
         if brand_domain:
             update_payload["brand_domain"] = brand_domain
-        workflow_ref.update(update_payload)
+        # Hydration may sign GCS URLs (IAM signBlob on Cloud Run), so it runs off the event loop with the writes.
+        await asyncio.to_thread(
+            _commit_steps_and_workflow_update, db, workflow_ref, steps_data, gcs_prefix, update_payload
+        )
         return {"workflow_id": workflow_id}
     except HTTPException:
         raise
     except Exception as e:
-        workflow_ref.update(
+        await asyncio.to_thread(
+            workflow_ref.update,
             {
                 "status": "failed",
                 "error": str(e),
                 "updatedAt": SERVER_TIMESTAMP,
-            }
+            },
         )
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -583,9 +722,6 @@ async def synthesize_from_description_impl(
     ephemeral: bool = False,
 ) -> str:
     """Generate workflow steps from a natural language description. Returns workflow_id."""
-    _ensure_agent_path()
-    from echo_prism_agent.synthesis.pipeline import synthesize_workflow_from_description
-
     workflow_id = str(uuid.uuid4())
     workflow_ref = db.collection("workflows").document(workflow_id)
     normalized_wf_type = workflow_type if workflow_type in ("browser", "desktop") else "browser"
@@ -599,8 +735,8 @@ async def synthesize_from_description_impl(
     }
     if ephemeral:
         payload["ephemeral"] = True
-    workflow_ref.set(payload)
-    client = genai.Client(api_key=GEMINI_API_KEY)
+    await asyncio.to_thread(workflow_ref.set, payload)
+    client = _genai_client()
     result = await synthesize_workflow_from_description(description, name, normalized_wf_type, client)
     steps_raw = result.get("steps", [])
     if not isinstance(steps_raw, list):
@@ -616,24 +752,20 @@ async def synthesize_from_description_impl(
             "Description synthesis returned no steps. The model response may not have been valid JSON, "
             "or the Gemini API failed. Check agent logs and try again."
         )
-        workflow_ref.update(
+        await asyncio.to_thread(
+            workflow_ref.update,
             {
                 "status": "failed",
                 "name": name,
                 "error": detail,
                 "updatedAt": SERVER_TIMESTAMP,
-            }
+            },
         )
         raise RuntimeError(detail)
 
     folder_prefix = f"{uid}/{workflow_id}"
     brand_domain = _brand_domain_from_steps(steps_data)
 
-    for i, s in enumerate(steps_data):
-        step_id = str(uuid.uuid4())
-        hydrated = _hydrate_step_dict(s, folder_prefix)
-        workflow_ref.collection("steps").document(step_id).set(_step_firestore_payload(i, hydrated))
-
     update_desc: dict = {
         "name": result.get("title") or name,
         "workflow_type": actual_type,
@@ -643,7 +775,7 @@ async def synthesize_from_description_impl(
     }
     if brand_domain:
         update_desc["brand_domain"] = brand_domain
-    workflow_ref.update(update_desc)
+    await asyncio.to_thread(_commit_steps_and_workflow_update, db, workflow_ref, steps_data, folder_prefix, update_desc)
     return workflow_id
 
 
@@ -659,10 +791,10 @@ async def synthesize_from_description_endpoint(
     uid: str = Depends(get_current_uid),
 ):
     """Create a workflow from a natural language description (no video required)."""
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
     try:
-        workflow_id = await synthesize_from_description_impl(uid, body.name, body.description, body.workflow_type, db)
+        workflow_id = await synthesize_from_description_impl(
+            uid, body.name, body.description, body.workflow_type, _db()
+        )
         return {"workflow_id": workflow_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
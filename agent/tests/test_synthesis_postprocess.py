@@ -52,3 +52,37 @@ def test_postprocess_dedupes_identical_consecutive():
     a = {"action": "wait", "context": "", "params": {"seconds": 1}, "expected_outcome": ""}
     steps, _ = _postprocess_steps([a, dict(a)])
     assert len(steps) == 1
+
+
+def test_postprocess_dedupes_nested_params_regardless_of_key_order():
+    a = {"action": "api_call", "context": "", "params": {"slug": "X", "arguments": {"a": [1, {"b": 2}], "c": "d"}}}
+    b = {"action": "api_call", "context": "", "params": {"arguments": {"c": "d", "a": [1, {"b": 2}]}, "slug": "X"}}
+    steps, _ = _postprocess_steps([a, b])
+    assert len(steps) == 1
+
+
+def test_postprocess_keeps_steps_differing_only_by_value_type():
+    steps, _ = _postprocess_steps(
+        [{"action": "select", "context": "", "params": {"value": v}} for v in (True, 1, 1.0, "1")]
+    )
+    assert [s["params"]["value"] for s in steps] == [True, 1, 1.0, "1"]
+
+
+def test_postprocess_drops_malformed_steps_and_defaults_nulls():
+    steps, _ = _postprocess_steps(["not a step", {"action": "wait", "context": None, "params": None}])
+    assert steps == [{"action": "wait", "context": "", "params": {}, "expected_outcome": ""}]
+
+
+def test_postprocess_defaults_missing_action_to_wait():
+    steps, _ = _postprocess_steps([{"context": "missing action"}])
+    assert steps == [{"action": "wait", "context": "missing action", "params": {}, "expected_outcome": ""}]
+
+
+def test_postprocess_coerces_non_string_context():
+    steps, _ = _postprocess_steps([{"action": "click", "context": 5, "expected_outcome": 1}])
+    assert steps == [{"action": "click", "context": "5", "params": {}, "expected_outcome": "1"}]
+
+
+def test_postprocess_ignores_mistyped_media_fields():
+    steps, _ = _postprocess_steps([{"action": "wait", "frame_image_url": 3, "context_attachments": "bad"}])
+    assert steps == [{"action": "wait", "context": "", "params": {}, "expected_outcome": ""}]
@@ -0,0 +1,34 @@
+"""Recovering workflow JSON from wrapped Gemini text."""
+
+from types import SimpleNamespace
+
+from echo_prism_agent.synthesis.pipeline import _first_json_object, _response_json
+
+
+def _response(text: str) -> SimpleNamespace:
+    return SimpleNamespace(parsed=None, text=text, candidates=[])
+
+
+def test_first_json_object_skips_braces_inside_strings():
+    text = 'Here is the JSON: {"title": "a } b", "steps": [{"context": "{not} a brace"}]} Hope this helps {x}'
+    assert _first_json_object(text) == '{"title": "a } b", "steps": [{"context": "{not} a brace"}]}'
+
+
+def test_first_json_object_handles_escaped_quotes():
+    text = '{"context": "say \\"}\\" twice"} trailing'
+    assert _first_json_object(text) == '{"context": "say \\"}\\" twice"}'
+
+
+def test_first_json_object_unbalanced_returns_none():
+    assert _first_json_object('{"title": "x"') is None
+    assert _first_json_object("no json here") is None
+
+
+def test_response_json_recovers_fenced_and_prose_wrapped_output():
+    assert _response_json(_response('```json\n{"title": "t", "steps": []}\n```'), "Test") == {"title": "t", "steps": []}
+    assert _response_json(_response('Sure! {"title": "t"} Let me know.'), "Test") == {"title": "t"}
+
+
+def test_response_json_prefers_sdk_parsed_dict():
+    resp = SimpleNamespace(parsed={"title": "p"}, text="not json", candidates=[])
+    assert _response_json(resp, "Test") == {"title": "p"}
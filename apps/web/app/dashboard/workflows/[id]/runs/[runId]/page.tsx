@@ -541,8 +541,9 @@ export default function RunDetailPage() {
         es = source;
         source.onmessage = (e) => {
           try {
+            // Log events arrive batched as an array; the final done/status message is a single object.
             const data = JSON.parse(e.data);
-            setLiveThoughts((prev) => [...prev, data]);
+            setLiveThoughts((prev) => [...prev, ...(Array.isArray(data) ? data : [data])]);
           } catch {
             /* ignore */
           }
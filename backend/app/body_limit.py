@@ -0,0 +1,49 @@
+"""
+Request-body size cap for proxied upload routes.
+
+Large files belong on the signed-URL path (``/api/storage/signed-upload-url``); anything routed
+through the API is bounded so one oversized POST can't tie up a worker's memory or temp disk.
+"""
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+MAX_PROXIED_UPLOAD_BYTES = 32 * 1024 * 1024  # Cloud Run's request-body limit
+
+
+class BodySizeLimitMiddleware:
+    """Reject request bodies over ``max_bytes`` on ``paths`` with 413.
+
+    A declared Content-Length is checked before any body is read; chunked bodies are counted
+    as they stream in and aborted once they cross the limit.
+    """
+
+    def __init__(self, app: ASGIApp, *, max_bytes: int, paths: tuple[str, ...]) -> None:
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Request body exceeds {self.max_bytes} bytes; use a signed upload URL"
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -56,3 +56,7 @@ LIVEKIT_URL = os.getenv("LIVEKIT_URL", "")
 LIVEKIT_API_KEY = os.getenv("LIVEKIT_API_KEY", "")
 LIVEKIT_API_SECRET = os.getenv("LIVEKIT_API_SECRET", "")
 LIVEKIT_AGENT_SECRET = os.getenv("LIVEKIT_AGENT_SECRET", "")
+
+# Worker threads for blocking Firestore/GCS calls offloaded with asyncio.to_thread (and FastAPI's sync
+# dependencies). The stdlib default of min(32, cpus + 4) caps in-flight requests on small Cloud Run CPUs.
+BLOCKING_IO_THREADS = int(os.getenv("ECHO_BLOCKING_IO_THREADS", "200"))
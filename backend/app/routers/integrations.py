@@ -12,10 +12,10 @@ Toolkit slugs sent to Tool Router must be verified (never guessed); see
 import logging
 import os
 
-import firebase_admin.firestore
 from fastapi import APIRouter, Depends, HTTPException
 
-from app.auth import get_current_uid, get_firebase_app
+from app.auth import get_current_uid
+from app.services.firestore import get_db
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/integrations", tags=["integrations"])
@@ -180,8 +180,7 @@ def _composio_active_toolkit_slugs(uid: str) -> set[str] | None:
 @router.get("")
 async def list_integrations(uid: str = Depends(get_current_uid)):
     """List integrations and optional Firestore connection metadata."""
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
+    db = get_db()
 
     connected_docs = db.collection("users").document(uid).collection("integrations").stream()
     connected = {d.id: d.to_dict() for d in connected_docs}
@@ -241,8 +240,7 @@ async def disconnect_integration(name: str, uid: str = Depends(get_current_uid))
                 detail="Failed to revoke connection in Composio. Try again in a moment.",
             ) from e
 
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
+    db = get_db()
     ref = db.collection("users").document(uid).collection("integrations").document(n)
     if ref.get().exists:
         ref.delete()
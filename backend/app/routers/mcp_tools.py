@@ -5,13 +5,13 @@ User MCP Tools CRUD: GET/POST/PUT/DELETE /api/mcp-tools + POST /api/mcp-tools/{i
 import logging
 import uuid
 
-import firebase_admin.firestore
 import httpx
 from fastapi import APIRouter, Depends, HTTPException
 from google.cloud.firestore import SERVER_TIMESTAMP
 from pydantic import BaseModel
 
-from app.auth import get_current_uid, get_firebase_app
+from app.auth import get_current_uid
+from app.services.firestore import get_db
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/mcp-tools", tags=["mcp-tools"])
@@ -28,8 +28,7 @@ class McpToolBody(BaseModel):
 
 @router.get("")
 async def list_mcp_tools(uid: str = Depends(get_current_uid)):
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
+    db = get_db()
     docs = db.collection("users").document(uid).collection("mcp_tools").stream()
     tools = [{"id": d.id, **d.to_dict()} for d in docs]
     return {"tools": tools}
@@ -37,8 +36,7 @@ async def list_mcp_tools(uid: str = Depends(get_current_uid)):
 
 @router.post("")
 async def create_mcp_tool(body: McpToolBody, uid: str = Depends(get_current_uid)):
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
+    db = get_db()
     tool_id = str(uuid.uuid4())
     data = {
         **body.model_dump(),
@@ -55,8 +53,7 @@ async def update_mcp_tool(
     body: McpToolBody,
     uid: str = Depends(get_current_uid),
 ):
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
+    db = get_db()
     ref = db.collection("users").document(uid).collection("mcp_tools").document(tool_id)
     if not ref.get().exists:
         raise HTTPException(status_code=404, detail="Tool not found")
@@ -66,8 +63,7 @@ async def update_mcp_tool(
 
 @router.delete("/{tool_id}")
 async def delete_mcp_tool(tool_id: str, uid: str = Depends(get_current_uid)):
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
+    db = get_db()
     ref = db.collection("users").document(uid).collection("mcp_tools").document(tool_id)
     if not ref.get().exists:
         raise HTTPException(status_code=404, detail="Tool not found")
@@ -78,8 +74,7 @@ async def delete_mcp_tool(tool_id: str, uid: str = Depends(get_current_uid)):
 @router.post("/{tool_id}/test")
 async def test_mcp_tool(tool_id: str, uid: str = Depends(get_current_uid)):
     """Test-call a user MCP tool with empty args and return the response."""
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
+    db = get_db()
     ref = db.collection("users").document(uid).collection("mcp_tools").document(tool_id)
     doc = ref.get()
     if not doc.exists:
@@ -10,12 +10,13 @@ Notifications are created when e.g. a workflow is shared with the user.
 """
 
 import logging
+from typing import Any
 
-import firebase_admin.firestore
 from fastapi import APIRouter, Depends, HTTPException
 from google.cloud.firestore import SERVER_TIMESTAMP
 
-from app.auth import get_current_uid, get_firebase_app
+from app.auth import get_current_uid
+from app.services.firestore import get_db
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/notifications", tags=["notifications"])
@@ -32,10 +33,9 @@ def _chunked(items: list, size: int):
 
 
 @router.get("")
-async def list_notifications(uid: str = Depends(get_current_uid)):
+async def list_notifications(uid: str = Depends(get_current_uid)) -> dict[str, Any]:
     """List notifications for the current user, newest first."""
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
+    db = get_db()
     docs = (
         db.collection("notifications")
         .where("to_uid", "==", uid)
@@ -53,8 +53,7 @@ async def list_notifications(uid: str = Depends(get_current_uid)):
 @router.post("/mark-all-read")
 async def mark_all_notifications_read(uid: str = Depends(get_current_uid)):
     """Mark every notification for the current user as read."""
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
+    db = get_db()
     updated_total = 0
     last_snap = None
     while True:
@@ -79,8 +78,7 @@ async def mark_all_notifications_read(uid: str = Depends(get_current_uid)):
 @router.post("/delete-all")
 async def delete_all_notifications(uid: str = Depends(get_current_uid)):
     """Delete all notifications for the current user (Admin SDK; client rules forbid delete)."""
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
+    db = get_db()
     deleted_total = 0
     last_snap = None
     while True:
@@ -107,8 +105,7 @@ async def delete_notification(
     uid: str = Depends(get_current_uid),
 ):
     """Delete a notification. Only the recipient can delete."""
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
+    db = get_db()
     ref = db.collection("notifications").document(notification_id)
     doc = ref.get()
     if not doc.exists:
@@ -126,8 +123,7 @@ async def mark_notification_read(
     uid: str = Depends(get_current_uid),
 ):
     """Mark a notification as read. Only the recipient can update."""
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
+    db = get_db()
     ref = db.collection("notifications").document(notification_id)
     doc = ref.get()
     if not doc.exists:
@@ -5,17 +5,18 @@ DELETE /api/run/{workflow_id}/{run_id}, POST /api/run/{workflow_id}/{run_id}/red
 POST /api/run/{workflow_id}/{run_id}/dismiss
 """
 
+import asyncio
 import logging
 import uuid
 from typing import Any
 
-import firebase_admin.firestore
 from fastapi import APIRouter, Depends, HTTPException
 from google.cloud.firestore import DELETE_FIELD, SERVER_TIMESTAMP, FieldFilter
 from pydantic import BaseModel
 
-from app.auth import get_current_uid, get_firebase_app
-from app.routers.workflows import _get_workflow
+from app.auth import get_current_uid
+from app.routers.workflows import _get_workflow, _get_workflow_with_doc
+from app.services.firestore import get_db
 
 logger = logging.getLogger(__name__)
 
@@ -40,9 +41,8 @@ async def patch_run(
     uid: str = Depends(get_current_uid),
 ):
     """Update run status (used by desktop agent to sync progress)."""
-    wf_ref, _ = _get_workflow(uid, workflow_id, require_owner=False)
-    run_ref = wf_ref.collection("runs").document(run_id)
-    doc = run_ref.get()
+    _, _, doc = _get_workflow_with_doc(uid, workflow_id, "runs", run_id, require_owner=False)
+    run_ref = doc.reference
     if not doc.exists:
         raise HTTPException(status_code=404, detail="Run not found")
     updates: dict[str, Any] = {"status": body.status, "updatedAt": SERVER_TIMESTAMP}
@@ -64,12 +64,9 @@ async def patch_run(
 async def list_runs(
     workflow_id: str,
     uid: str = Depends(get_current_uid),
-):
-    _get_workflow(uid, workflow_id, require_owner=False)
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
-    runs_ref = db.collection("workflows").document(workflow_id).collection("runs")
-    docs = runs_ref.order_by("createdAt", direction="DESCENDING").limit(50).stream()
+) -> dict[str, Any]:
+    wf_ref, _ = _get_workflow(uid, workflow_id, require_owner=False, access_only=True)
+    docs = wf_ref.collection("runs").order_by("createdAt", direction="DESCENDING").limit(50).stream()
     items = [{"id": d.id, **d.to_dict()} for d in docs]
     return {"runs": items}
 
@@ -81,9 +78,8 @@ async def poll_run_signals(
     uid: str = Depends(get_current_uid),
 ):
     """Poll for redirect/cancel/calluser_feedback. Used by desktop agent between steps. Returns and clears redirect_instruction and calluser_feedback."""
-    wf_ref, _ = _get_workflow(uid, workflow_id, require_owner=False)
-    run_ref = wf_ref.collection("runs").document(run_id)
-    doc = run_ref.get()
+    _, _, doc = _get_workflow_with_doc(uid, workflow_id, "runs", run_id, require_owner=False)
+    run_ref = doc.reference
     if not doc.exists:
         raise HTTPException(status_code=404, detail="Run not found")
     data = doc.to_dict() or {}
@@ -113,12 +109,8 @@ async def get_run(
     workflow_id: str,
     run_id: str,
     uid: str = Depends(get_current_uid),
-):
-    _get_workflow(uid, workflow_id, require_owner=False)
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
-    run_ref = db.collection("workflows").document(workflow_id).collection("runs").document(run_id)
-    doc = run_ref.get()
+) -> dict[str, Any]:
+    _, _, doc = _get_workflow_with_doc(uid, workflow_id, "runs", run_id, require_owner=False)
     if not doc.exists:
         raise HTTPException(status_code=404, detail="Run not found")
     return {"id": doc.id, **doc.to_dict()}
@@ -127,29 +119,42 @@ async def get_run(
 ACTIVE_RUN_STATUSES = ("running", "pending", "awaiting_user")
 
 
-def _cancel_other_active_runs_for_user(uid: str) -> None:
-    """Cancel all runs owned by this user that are running, pending, or awaiting_user."""
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
+def _start_run(uid: str, run_ref: Any) -> None:
+    """Cancel the user's other running, pending, or awaiting_user runs and create ``run_ref``, in one commit."""
+    db = get_db()
     active = (
         db.collection_group("runs")
         .where(filter=FieldFilter("owner_uid", "==", uid))
         .where(filter=FieldFilter("status", "in", list(ACTIVE_RUN_STATUSES)))
+        .select([])
         .stream()
     )
+    batch = db.batch()
+    cancelled: list[str] = []
     for doc in active:
-        try:
-            doc.reference.update(
-                {
-                    "status": "cancelled",
-                    "cancel_requested": True,
-                    "completedAt": SERVER_TIMESTAMP,
-                    "updatedAt": SERVER_TIMESTAMP,
-                }
-            )
-            logger.info("Cancelled prior active run %s for user %s", doc.id, uid)
-        except Exception as e:
-            logger.warning("Failed to cancel run %s: %s", doc.id, e)
+        batch.update(
+            doc.reference,
+            {
+                "status": "cancelled",
+                "cancel_requested": True,
+                "completedAt": SERVER_TIMESTAMP,
+                "updatedAt": SERVER_TIMESTAMP,
+            },
+        )
+        cancelled.append(doc.id)
+    batch.set(
+        run_ref,
+        {
+            "status": "running",
+            "owner_uid": uid,
+            "createdAt": SERVER_TIMESTAMP,
+            "confirmation_status": None,
+            "source": "desktop",
+        },
+    )
+    batch.commit()
+    for run_id in cancelled:
+        logger.info("Cancelled prior active run %s for user %s", run_id, uid)
 
 
 @router.post("/run/{workflow_id}")
@@ -166,19 +171,9 @@ async def create_run(
             status_code=400,
             detail="Only source=desktop is supported. Provide ?source=desktop",
         )
-    _cancel_other_active_runs_for_user(uid)
-    wf_ref, _ = _get_workflow(uid, workflow_id, require_owner=False)
+    wf_ref, _ = _get_workflow(uid, workflow_id, require_owner=False, access_only=True)
     run_id = str(uuid.uuid4())
-    run_ref = wf_ref.collection("runs").document(run_id)
-    run_ref.set(
-        {
-            "status": "running",
-            "owner_uid": uid,
-            "createdAt": SERVER_TIMESTAMP,
-            "confirmation_status": None,
-            "source": "desktop",
-        }
-    )
+    await asyncio.to_thread(_start_run, uid, wf_ref.collection("runs").document(run_id))
     return {"run_id": run_id, "workflow_id": workflow_id}
 
 
@@ -188,9 +183,8 @@ async def confirm_run(
     run_id: str,
     uid: str = Depends(get_current_uid),
 ):
-    wf_ref, _ = _get_workflow(uid, workflow_id, require_owner=False)
-    run_ref = wf_ref.collection("runs").document(run_id)
-    doc = run_ref.get()
+    _, _, doc = _get_workflow_with_doc(uid, workflow_id, "runs", run_id, require_owner=False)
+    run_ref = doc.reference
     if not doc.exists:
         raise HTTPException(status_code=404, detail="Run not found")
     run_ref.update(
@@ -208,9 +202,8 @@ async def cancel_run(
     run_id: str,
     uid: str = Depends(get_current_uid),
 ):
-    wf_ref, _ = _get_workflow(uid, workflow_id, require_owner=False)
-    run_ref = wf_ref.collection("runs").document(run_id)
-    doc = run_ref.get()
+    _, _, doc = _get_workflow_with_doc(uid, workflow_id, "runs", run_id, require_owner=False)
+    run_ref = doc.reference
     if not doc.exists:
         raise HTTPException(status_code=404, detail="Run not found")
     run_ref.update(
@@ -236,9 +229,8 @@ async def redirect_run(
     uid: str = Depends(get_current_uid),
 ):
     """Inject a mid-run redirect instruction for the agent to pick up between steps."""
-    wf_ref, _ = _get_workflow(uid, workflow_id, require_owner=False)
-    run_ref = wf_ref.collection("runs").document(run_id)
-    doc = run_ref.get()
+    _, _, doc = _get_workflow_with_doc(uid, workflow_id, "runs", run_id, require_owner=False)
+    run_ref = doc.reference
     if not doc.exists:
         raise HTTPException(status_code=404, detail="Run not found")
     data = doc.to_dict() or {}
@@ -267,9 +259,8 @@ async def calluser_feedback(
     uid: str = Depends(get_current_uid),
 ):
     """Send feedback when run is awaiting_user; stores instruction and sets status to running for agent to resume with."""
-    wf_ref, _ = _get_workflow(uid, workflow_id, require_owner=False)
-    run_ref = wf_ref.collection("runs").document(run_id)
-    doc = run_ref.get()
+    _, _, doc = _get_workflow_with_doc(uid, workflow_id, "runs", run_id, require_owner=False)
+    run_ref = doc.reference
     if not doc.exists:
         raise HTTPException(status_code=404, detail="Run not found")
     data = doc.to_dict() or {}
@@ -297,9 +288,8 @@ async def dismiss_calluser(
     """Dismiss an awaiting_user run (user has resolved the issue manually).
     Marks the run as completed so the frontend moves to the log view.
     """
-    wf_ref, _ = _get_workflow(uid, workflow_id, require_owner=False)
-    run_ref = wf_ref.collection("runs").document(run_id)
-    doc = run_ref.get()
+    _, _, doc = _get_workflow_with_doc(uid, workflow_id, "runs", run_id, require_owner=False)
+    run_ref = doc.reference
     if not doc.exists:
         raise HTTPException(status_code=404, detail="Run not found")
     data = doc.to_dict() or {}
@@ -316,12 +306,11 @@ async def dismiss_calluser(
 
 
 @router.get("/user/pending-runs")
-async def get_pending_runs(uid: str = Depends(get_current_uid)):
+async def get_pending_runs(uid: str = Depends(get_current_uid)) -> dict[str, Any]:
     """Return all pending runs for the authenticated user.
     Used by desktop app to auto-detect runs triggered from mobile chat/voice.
     """
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
+    db = get_db()
     query = (
         db.collection_group("runs")
         .where(filter=FieldFilter("owner_uid", "==", uid))
@@ -34,7 +34,7 @@ async def create_or_update_schedule(
     body: ScheduleBody,
     uid: str = Depends(get_current_uid),
 ):
-    _get_workflow(uid, workflow_id)
+    _get_workflow(uid, workflow_id, access_only=True)
     project = os.environ.get("GOOGLE_CLOUD_PROJECT") or os.environ.get("GCP_PROJECT")
     location = os.environ.get("SCHEDULER_LOCATION", "us-central1")
     if not project:
@@ -80,7 +80,7 @@ async def delete_schedule(
     workflow_id: str,
     uid: str = Depends(get_current_uid),
 ):
-    _get_workflow(uid, workflow_id)
+    _get_workflow(uid, workflow_id, access_only=True)
     project = os.environ.get("GOOGLE_CLOUD_PROJECT") or os.environ.get("GCP_PROJECT")
     location = os.environ.get("SCHEDULER_LOCATION", "us-central1")
     if not project:
@@ -1,15 +1,19 @@
+import asyncio
 import time
 import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.auth import get_current_uid
 from app.config import GCS_BUCKET
-from app.services.gcs import generate_signed_upload_url, upload_file
+from app.services.gcs import generate_signed_upload_url, upload_fileobj
 
 router = APIRouter(prefix="/storage", tags=["storage"])
 
+# Upper bound on one batch signing request; each URL is a signing thread (and possibly an IAM RPC).
+MAX_SIGNED_UPLOADS = 50
+
 
 @router.post("/upload")
 async def upload(
@@ -17,9 +21,8 @@ async def upload(
     uid: str = Depends(get_current_uid),
 ):
     try:
-        content = await file.read()
         blob_name = f"users/{uid}/{file.filename or 'file'}"
-        path = upload_file(blob_name, content, file.content_type)
+        path = await asyncio.to_thread(upload_fileobj, blob_name, file.file, file.content_type)
         return {"path": path}
     except ValueError as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -30,6 +33,10 @@ class SignedUploadRequest(BaseModel):
     content_type: str
 
 
+class SignedUploadsRequest(BaseModel):
+    files: list[SignedUploadRequest] = Field(max_length=MAX_SIGNED_UPLOADS)
+
+
 @router.post("/upload-recording")
 async def upload_recording(
     video: UploadFile,
@@ -37,11 +44,10 @@ async def upload_recording(
 ):
     """Upload a recording via the backend (avoids GCS CORS for desktop/Electron)."""
     try:
-        content = await video.read()
         ext = "webm" if (video.content_type or "").find("webm") >= 0 else "mp4"
         filename = f"recording-{int(time.time() * 1000)}.{ext}"
         blob_name = f"uploads/{uid}/{uuid.uuid4()}/{filename}"
-        gcs_path = upload_file(blob_name, content, video.content_type or f"video/{ext}")
+        gcs_path = await asyncio.to_thread(upload_fileobj, blob_name, video.file, video.content_type or f"video/{ext}")
         return {"gcs_path": gcs_path}
     except ValueError as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -61,3 +67,33 @@ async def get_signed_upload_url(
         return {"signed_url": signed_url, "gcs_path": gcs_path}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/signed-upload-urls")
+async def get_signed_upload_urls(
+    req: SignedUploadsRequest,
+    uid: str = Depends(get_current_uid),
+):
+    """Batch variant of ``/signed-upload-url`` (e.g. screenshots) so every file goes straight
+    to Cloud Storage. All files share one upload folder; URLs are returned in request order.
+    Blob names carry the request index so files with the same name don't overwrite each other."""
+    if not req.files:
+        raise HTTPException(status_code=400, detail="No files requested")
+    folder = f"uploads/{uid}/{uuid.uuid4()}"
+    blob_names = [f"{folder}/{i}_{f.filename}" for i, f in enumerate(req.files)]
+    try:
+        # Signing may call the IAM signBlob API on Cloud Run, so sign concurrently off the event loop.
+        signed_urls = await asyncio.gather(
+            *(
+                asyncio.to_thread(generate_signed_upload_url, blob_name, f.content_type)
+                for blob_name, f in zip(blob_names, req.files, strict=True)
+            )
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "uploads": [
+            {"signed_url": url, "gcs_path": f"gs://{GCS_BUCKET}/{blob_name}"}
+            for url, blob_name in zip(signed_urls, blob_names, strict=True)
+        ]
+    }
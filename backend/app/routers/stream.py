@@ -4,21 +4,175 @@ Streams real-time EchoPrism thought+action events from Firestore logs.
 """
 
 import asyncio
+import functools
 import json
 import logging
+from collections import deque
+from datetime import datetime
 
-import firebase_admin.firestore
-from fastapi import APIRouter, Depends, HTTPException
+import firebase_admin.firestore_async
+from fastapi import APIRouter, Depends, Header, HTTPException
 from sse_starlette.sse import EventSourceResponse
 
 from app.auth import get_current_uid_for_stream, get_firebase_app
+from app.services.firestore import get_db
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["stream"])
 
-
-def _list_logs_ordered(logs_ref):
-    return list(logs_ref.order_by("timestamp").stream())
+TERMINAL_RUN_STATUSES = ("completed", "failed", "cancelled")
+_IDLE_TIMEOUT_S = 300.0  # stop after ~5 minutes of silence
+_TERMINAL_GRACE_S = 1.0  # logs and run status arrive on separate listeners; let trailing logs land
+_WATCH_CHECK_S = 5.0  # how often an idle stream checks that its Firestore listeners are still alive
+_MAX_REPLAY_LOGS = 500  # log docs cached per run for late subscribers; older ones are re-read on demand
+
+
+@functools.lru_cache(maxsize=1)
+def _adb():
+    return firebase_admin.firestore_async.client(get_firebase_app())
+
+
+def _log_event(data: dict) -> dict | None:
+    thought = data.get("thought") or data.get("message", "")
+    action = data.get("action", "")
+    if not (thought or action):
+        return None
+    return {
+        "thought": thought,
+        "action": action,
+        "step_index": data.get("step_index", 0),
+        "level": data.get("level", "info"),
+    }
+
+
+def _log_cursor(data: dict) -> str | None:
+    """SSE event id for a log doc: its Firestore timestamp, so reconnects can resume after it."""
+    ts = data.get("timestamp")
+    return ts.isoformat() if isinstance(ts, datetime) else None
+
+
+def _parse_log_cursor(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _is_after(data: dict, after: datetime | None) -> bool:
+    ts = data.get("timestamp")
+    return after is None or not isinstance(ts, datetime) or ts > after
+
+
+class _RunBroadcaster:
+    """One pair of Firestore listeners per run, fanned out to every SSE connection watching it.
+
+    Listener callbacks run on the SDK's watch thread and hop to the loop via ``call_soon_threadsafe``;
+    all other state is touched only on the loop thread. The logs listener starts after the first
+    subscriber's cursor, and the newest ``_MAX_REPLAY_LOGS`` log docs are kept for late subscribers.
+    Anything at or before ``_floor`` (never read, or trimmed) is backfilled from Firestore on subscribe.
+    Each subscriber only receives logs newer than its own ``Last-Event-ID``.
+    """
+
+    def __init__(self, key: tuple[str, str], run_ref, resume_after: datetime | None) -> None:
+        self._key = key
+        self._loop = asyncio.get_running_loop()
+        self._run_ref = run_ref
+        self._subscribers: dict[asyncio.Queue[tuple[str, dict]], datetime | None] = {}
+        self._pending = 0
+        self._logs: deque[dict] = deque()
+        self._floor = resume_after
+        self._run: dict | None = None
+        logs_query = run_ref.collection("logs").order_by("timestamp")
+        if resume_after is not None:
+            logs_query = logs_query.start_after({"timestamp": resume_after})
+        self._logs_watch = logs_query.on_snapshot(self._on_logs)
+        self._run_watch = run_ref.on_snapshot(self._on_run)
+
+    def _on_logs(self, _docs, changes, _read_time) -> None:
+        for change in changes:
+            if change.type.name == "ADDED":
+                self._loop.call_soon_threadsafe(self._publish, "log", change.document.to_dict() or {})
+
+    def _on_run(self, docs, _changes, _read_time) -> None:
+        for doc in docs:
+            self._loop.call_soon_threadsafe(self._publish, "run", doc.to_dict() or {})
+
+    def _publish(self, kind: str, data: dict) -> None:
+        if kind == "run":
+            self._run = data
+            for queue in self._subscribers:
+                queue.put_nowait((kind, data))
+            return
+        self._logs.append(data)
+        if len(self._logs) > _MAX_REPLAY_LOGS:
+            ts = self._logs.popleft().get("timestamp")
+            if isinstance(ts, datetime) and (self._floor is None or ts > self._floor):
+                self._floor = ts
+        for queue, after in self._subscribers.items():
+            if _is_after(data, after):
+                queue.put_nowait((kind, data))
+
+    def alive(self) -> bool:
+        """False once either watch stream has died (the SDK gives no error callback)."""
+        return self._logs_watch.is_active and self._run_watch.is_active
+
+    def _read_logs(self, after: datetime | None, upto: datetime) -> list[dict]:
+        query = self._run_ref.collection("logs").order_by("timestamp")
+        if after is not None:
+            query = query.start_after({"timestamp": after})
+        return [doc.to_dict() or {} for doc in query.end_at({"timestamp": upto}).stream()]
+
+    async def subscribe(self, resume_after: datetime | None) -> asyncio.Queue[tuple[str, dict]]:
+        queue: asyncio.Queue[tuple[str, dict]] = asyncio.Queue()
+        self._pending += 1
+        try:
+            # Logs at or before the floor aren't cached; read them first. The floor can rise while we
+            # wait (trimming), so loop until the cache covers everything after ``covered``.
+            covered = resume_after
+            while self._floor is not None and (covered is None or covered < self._floor):
+                upto = self._floor
+                for data in await asyncio.to_thread(self._read_logs, covered, upto):
+                    queue.put_nowait(("log", data))
+                covered = upto
+        except Exception:
+            self._pending -= 1
+            self._close_if_idle()
+            raise
+        self._pending -= 1
+        for data in self._logs:
+            if _is_after(data, covered):
+                queue.put_nowait(("log", data))
+        if self._run is not None:
+            queue.put_nowait(("run", self._run))
+        self._subscribers[queue] = covered
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue[tuple[str, dict]]) -> None:
+        self._subscribers.pop(queue, None)
+        self._close_if_idle()
+
+    def _close_if_idle(self) -> None:
+        if self._subscribers or self._pending:
+            return
+        self._logs_watch.unsubscribe()
+        self._run_watch.unsubscribe()
+        if _broadcasters.get(self._key) is self:
+            del _broadcasters[self._key]
+
+
+_broadcasters: dict[tuple[str, str], _RunBroadcaster] = {}
+
+
+async def _subscribe(workflow_id: str, run_id: str, resume_after: datetime | None):
+    key = (workflow_id, run_id)
+    broadcaster = _broadcasters.get(key)
+    if broadcaster is None or not broadcaster.alive():
+        # A dead broadcaster is dropped here; its remaining subscribers notice and end their streams.
+        run_ref = get_db().collection("workflows").document(workflow_id).collection("runs").document(run_id)
+        broadcaster = _broadcasters[key] = _RunBroadcaster(key, run_ref, resume_after)
+    return broadcaster, await broadcaster.subscribe(resume_after)
 
 
 @router.get("/run/{workflow_id}/{run_id}/stream")
@@ -26,12 +180,16 @@ async def stream_run_thoughts(
     workflow_id: str,
     run_id: str,
     uid: str = Depends(get_current_uid_for_stream),
+    last_event_id: str | None = Header(default=None),
 ):
-    """Server-Sent Events stream of EchoPrism thoughts for a live run."""
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
-    run_ref = db.collection("workflows").document(workflow_id).collection("runs").document(run_id)
-    run_snap = await asyncio.to_thread(run_ref.get)
+    """Server-Sent Events stream of EchoPrism thoughts for a live run.
+
+    Each message is a JSON array of log events (a burst is coalesced into one frame); the final
+    message is a single ``{"done": true, "status": ...}`` object. EventSource resends the last event
+    id on reconnect; replay then starts after that timestamp instead of every historical log.
+    """
+    # Ownership check is a native grpc-aio read; listeners need the sync client (no async on_snapshot).
+    run_snap = await _adb().collection("workflows").document(workflow_id).collection("runs").document(run_id).get()
     if not run_snap.exists:
         raise HTTPException(status_code=404, detail="Run not found")
     run_owner = (run_snap.to_dict() or {}).get("owner_uid")
@@ -39,57 +197,46 @@ async def stream_run_thoughts(
         raise HTTPException(status_code=403, detail="Forbidden")
 
     async def event_generator():
-        seen_ids: set[str] = set()
-        consecutive_empty = 0
-        max_empty = 300  # stop after ~5 minutes of silence
-
-        while True:
-            try:
-                run_snap = await asyncio.to_thread(run_ref.get)
-                run_data = run_snap.to_dict() or {}
-                run_status = run_data.get("status", "")
-
-                logs_ref = run_ref.collection("logs")
-                docs = await asyncio.to_thread(_list_logs_ordered, logs_ref)
-
-                new_events = []
-                for doc in docs:
-                    if doc.id not in seen_ids:
-                        seen_ids.add(doc.id)
-                        data = doc.to_dict() or {}
-                        thought = data.get("thought") or data.get("message", "")
-                        action = data.get("action", "")
-                        step_index = data.get("step_index", 0)
-                        level = data.get("level", "info")
-                        if thought or action:
-                            new_events.append(
-                                {
-                                    "thought": thought,
-                                    "action": action,
-                                    "step_index": step_index,
-                                    "level": level,
-                                }
-                            )
-
-                if new_events:
-                    consecutive_empty = 0
-                    for event in new_events:
-                        yield {"data": json.dumps(event)}
-                else:
-                    consecutive_empty += 1
-
-                # Stop streaming when run is terminal or too quiet
-                if run_status in ("completed", "failed", "cancelled"):
-                    yield {"data": json.dumps({"done": True, "status": run_status})}
-                    break
-
-                if consecutive_empty >= max_empty:
-                    break
-
-                await asyncio.sleep(1.0)
-
-            except Exception as e:
-                logger.error("SSE stream error: %s", e)
-                await asyncio.sleep(2.0)
+        # Viewers of the same run (several tabs/devices) share one set of Firestore listeners.
+        broadcaster, queue = await _subscribe(workflow_id, run_id, _parse_log_cursor(last_event_id))
+        try:
+            terminal_status: str | None = None
+            waited = 0.0
+            while True:
+                limit = _TERMINAL_GRACE_S if terminal_status else _IDLE_TIMEOUT_S
+                step = min(_WATCH_CHECK_S, limit - waited)
+                try:
+                    items = [await asyncio.wait_for(queue.get(), timeout=step)]
+                except TimeoutError:
+                    waited += step
+                    if waited >= limit:
+                        break
+                    if not broadcaster.alive():
+                        # Ending the response makes EventSource reconnect with Last-Event-ID.
+                        logger.warning("SSE listeners for run %s stopped; closing stream", run_id)
+                        break
+                    continue
+                waited = 0.0
+                # Coalesce whatever else is already queued (replay, log bursts) into one SSE frame.
+                while not queue.empty():
+                    items.append(queue.get_nowait())
+                events: list[dict] = []
+                cursor: str | None = None
+                for kind, data in items:
+                    if kind == "log":
+                        event = _log_event(data)
+                        if event:
+                            events.append(event)
+                            cursor = _log_cursor(data) or cursor
+                    elif terminal_status is None and data.get("status") in TERMINAL_RUN_STATUSES:
+                        terminal_status = data["status"]
+                if events:
+                    yield {"id": cursor, "data": json.dumps(events)} if cursor else {"data": json.dumps(events)}
+            if terminal_status:
+                yield {"data": json.dumps({"done": True, "status": terminal_status})}
+        except Exception as e:
+            logger.error("SSE stream error: %s", e)
+        finally:
+            broadcaster.unsubscribe(queue)
 
     return EventSourceResponse(event_generator())
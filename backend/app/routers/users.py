@@ -1,12 +1,14 @@
+import asyncio
 import re
 
-import firebase_admin.firestore
 from fastapi import APIRouter, Depends, HTTPException
 from firebase_admin import auth as firebase_auth
+from google.api_core import exceptions as gcp_exceptions
 from google.cloud.firestore import SERVER_TIMESTAMP
 from pydantic import BaseModel
 
 from app.auth import get_current_uid, get_current_user, get_firebase_app
+from app.services.firestore import get_db
 
 
 def _normalize_phone_e164(value: str) -> str:
@@ -25,6 +27,26 @@ def _normalize_phone_e164(value: str) -> str:
 router = APIRouter(prefix="/users", tags=["users"])
 
 
+def _upsert_user(user_ref, user_data: dict) -> bool:
+    """Write the profile; returns True if the doc was created.
+
+    Returning users (the common case) take one update RPC instead of a get followed by a write;
+    only a first sign-in pays a second round trip to create the doc with ``createdAt``.
+    """
+    try:
+        user_ref.update(user_data)
+        return False
+    except gcp_exceptions.NotFound:
+        pass
+    try:
+        user_ref.create({**user_data, "createdAt": SERVER_TIMESTAMP})
+        return True
+    except gcp_exceptions.AlreadyExists:
+        # A concurrent first sign-in created it between our two calls.
+        user_ref.update(user_data)
+        return False
+
+
 class UserInitResponse(BaseModel):
     uid: str
     email: str | None
@@ -41,11 +63,9 @@ async def init_user(current_user: dict = Depends(get_current_user)):
     if not uid:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
+    db = get_db()
 
     user_ref = db.collection("users").document(uid)
-    snapshot = user_ref.get()
 
     provider = current_user.get("firebase", {}).get("sign_in_provider") or current_user.get("provider", "password")
     if isinstance(provider, dict):
@@ -60,30 +80,24 @@ async def init_user(current_user: dict = Depends(get_current_user)):
         "updatedAt": SERVER_TIMESTAMP,
     }
 
-    created = False
-    if not snapshot.exists:
-        user_data["createdAt"] = SERVER_TIMESTAMP
-        user_ref.set(user_data, merge=True)
-        created = True
-    else:
-        user_ref.update(user_data)
+    created = await asyncio.to_thread(_upsert_user, user_ref, user_data)
 
-    return UserInitResponse(
-        uid=uid,
-        email=user_data["email"],
-        display_name=user_data["displayName"],
-        photo_url=user_data["photoURL"],
-        provider=user_data["provider"],
-        created=created,
-    )
+    # Plain dict: response_model validates and serializes it once; building the model here would validate twice.
+    return {
+        "uid": uid,
+        "email": user_data["email"],
+        "display_name": user_data["displayName"],
+        "photo_url": user_data["photoURL"],
+        "provider": user_data["provider"],
+        "created": created,
+    }
 
 
 @router.get("/me")
 async def get_me(uid: str = Depends(get_current_uid)):
     """Return the current user's Firestore profile document."""
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
-    doc = db.collection("users").document(uid).get()
+    db = get_db()
+    doc = await asyncio.to_thread(db.collection("users").document(uid).get)
     if not doc.exists:
         raise HTTPException(status_code=404, detail="User profile not found")
     return {"uid": uid, **doc.to_dict()}
@@ -98,8 +112,7 @@ class UserUpdateBody(BaseModel):
 @router.put("/me")
 async def update_me(body: UserUpdateBody, uid: str = Depends(get_current_uid)):
     """Update the current user's display name, preferences, or phone (E.164)."""
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
+    db = get_db()
     updates: dict = {"updatedAt": SERVER_TIMESTAMP}
     if body.display_name is not None:
         updates["displayName"] = body.display_name
@@ -108,7 +121,7 @@ async def update_me(body: UserUpdateBody, uid: str = Depends(get_current_uid)):
     if body.phone is not None:
         raw = body.phone.strip() or None
         updates["phone"] = _normalize_phone_e164(raw) if raw else None
-    db.collection("users").document(uid).update(updates)
+    await asyncio.to_thread(db.collection("users").document(uid).update, updates)
     return {"ok": True}
 
 
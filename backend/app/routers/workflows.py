@@ -3,22 +3,35 @@ Workflow and step CRUD: GET/POST /api/workflows, GET/PUT/DELETE /api/workflows/{
 GET/POST /api/workflows/{id}/steps, PUT/DELETE /api/workflows/{id}/steps/{step_id}
 """
 
+import asyncio
+import base64
+import functools
+import json
 import logging
 import re
+import time
 import uuid
+from types import MappingProxyType
 from typing import Any
 from urllib.parse import unquote, urlparse
 
 import firebase_admin.auth
 import firebase_admin.firestore
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import Response
 from google.api_core import exceptions as gcp_exceptions
 from google.cloud.firestore import DELETE_FIELD, SERVER_TIMESTAMP, ArrayRemove, ArrayUnion, FieldFilter
 from pydantic import BaseModel
 
-from app.auth import get_current_uid, get_firebase_app
+from app.auth import get_current_uid
 from app.config import FIREBASE_STORAGE_BUCKET, GCS_BUCKET
+from app.services.firestore import get_db
+from app.services.gcs import (
+    download_file,
+    download_from_bucket,
+    generate_signed_read_url,
+    list_blob_names_with_prefix,
+)
 
 router = APIRouter(prefix="/workflows", tags=["workflows"])
 _log = logging.getLogger(__name__)
@@ -43,11 +56,26 @@ def _validate_flow_graph_step_ids(wf_ref: Any, flow_graph: dict[str, Any]) -> No
             )
 
 
-def _get_workflow(uid: str, workflow_id: str, require_owner: bool = True) -> tuple[Any, Any]:
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
+# Fields the owner/shared/editor checks read; access-only lookups fetch just these.
+_ACCESS_FIELDS = ("owner_uid", "shared_with", "collaborator_roles")
+
+
+def _get_workflow(
+    uid: str, workflow_id: str, require_owner: bool = True, *, access_only: bool = False
+) -> tuple[Any, Any]:
+    """Workflow ref and data after an access check.
+
+    With ``access_only`` the read is field-masked to ``_ACCESS_FIELDS``, so callers that only need the
+    check skip transferring large fields such as ``flow_graph``.
+    """
+    db = get_db()
     wf_ref = db.collection("workflows").document(workflow_id)
-    doc = wf_ref.get()
+    doc = wf_ref.get(field_paths=_ACCESS_FIELDS) if access_only else wf_ref.get()
+    return wf_ref, _workflow_data_for(uid, doc, require_owner)
+
+
+def _workflow_data_for(uid: str, doc: Any, require_owner: bool) -> dict[str, Any]:
+    """Access check on a fetched workflow snapshot; returns its data or raises 404/403."""
     if not doc.exists:
         raise HTTPException(status_code=404, detail="Workflow not found")
     data = doc.to_dict()
@@ -57,7 +85,105 @@ def _get_workflow(uid: str, workflow_id: str, require_owner: bool = True) -> tup
         raise HTTPException(status_code=403, detail="Forbidden")
     if not require_owner and not is_owner and not is_shared:
         raise HTTPException(status_code=403, detail="Forbidden")
-    return wf_ref, data
+    return data
+
+
+def _get_workflow_with_doc(
+    uid: str,
+    workflow_id: str,
+    subcollection: str,
+    doc_id: str,
+    require_owner: bool = True,
+    *,
+    access_only: bool = False,
+) -> tuple[Any, dict[str, Any], Any]:
+    """``_get_workflow`` plus one doc from a workflow subcollection, both read in one ``get_all`` round-trip.
+
+    Returns ``(wf_ref, data, child_snapshot)``; the workflow access check runs first, so callers raise
+    their own 404 for a missing child only after 404/403 on the workflow. ``access_only`` masks *both*
+    reads to ``_ACCESS_FIELDS`` (the child then only answers ``exists``).
+    """
+    db = get_db()
+    wf_ref = db.collection("workflows").document(workflow_id)
+    child_ref = wf_ref.collection(subcollection).document(doc_id)
+    field_paths = _ACCESS_FIELDS if access_only else None
+    snaps = {snap.reference.path: snap for snap in db.get_all([wf_ref, child_ref], field_paths=field_paths)}
+    return wf_ref, _workflow_data_for(uid, snaps[wf_ref.path], require_owner), snaps[child_ref.path]
+
+
+def _get_workflow_and_step(uid: str, workflow_id: str, step_id: str) -> tuple[Any, Any]:
+    """Workflow and step refs for an editor, after one batched read of both docs."""
+    wf_ref, data, step_doc = _get_workflow_with_doc(
+        uid, workflow_id, "steps", step_id, require_owner=False, access_only=True
+    )
+    _assert_can_edit_workflow(uid, data)
+    if not step_doc.exists:
+        raise HTTPException(status_code=404, detail="Step not found")
+    return wf_ref, step_doc.reference
+
+
+# Firestore caps a WriteBatch at 500 operations.
+_FIRESTORE_BATCH_LIMIT = 500
+
+
+def _delete_workflow_and_steps(wf_ref: Any) -> None:
+    """Delete every step, then the workflow doc, in batched commits (one RPC per 500 deletes)."""
+    db = get_db()
+    batch = db.batch()
+    n_ops = 0
+    # Empty projection: stream bare references without step payloads.
+    for step in wf_ref.collection("steps").select([]).stream():
+        batch.delete(step.reference)
+        n_ops += 1
+        if n_ops == _FIRESTORE_BATCH_LIMIT:
+            batch.commit()
+            batch = db.batch()
+            n_ops = 0
+    # The workflow doc rides in the last batch, after all earlier step batches have committed.
+    batch.delete(wf_ref)
+    batch.commit()
+
+
+def _write_fork(db: Any, old_ref: Any, new_ref: Any, fork_payload: dict[str, Any]) -> None:
+    """Create the forked workflow doc and copy every step in batched commits (one RPC per 500 writes)."""
+    steps_col = new_ref.collection("steps")
+    batch = db.batch()
+    batch.set(new_ref, fork_payload)
+    n_ops = 1
+    for step_doc in old_ref.collection("steps").stream():
+        batch.set(steps_col.document(), step_doc.to_dict() or {})
+        n_ops += 1
+        if n_ops == _FIRESTORE_BATCH_LIMIT:
+            batch.commit()
+            batch = db.batch()
+            n_ops = 0
+    if n_ops:
+        batch.commit()
+
+
+_MAX_PAGE_SIZE = 500
+
+
+def _encode_cursor(values: dict[str, Any]) -> str:
+    """Opaque page cursor: the last returned doc's order-by values, so the next page seeks past it."""
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> dict[str, Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        values = None
+    if not isinstance(values, dict) or not isinstance(values.get("__name__"), str):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def _workflow_id_page(query: Any, after_id: str | None, limit: int) -> list[Any]:
+    q = query.order_by("__name__")
+    if after_id is not None:
+        q = q.start_after({"__name__": after_id})
+    return list(q.limit(limit).stream())
 
 
 def _collaborator_role(data: dict[str, Any], collaborator_uid: str) -> str:
@@ -218,8 +344,6 @@ def _download_context_media_bytes(
     ECHO_FIREBASE_STORAGE_BUCKET (with the same aliases) — synthesis and signed URLs can disagree
     on which bucket id is used for the same underlying bucket.
     """
-    from app.services.gcs import download_from_bucket, list_blob_names_with_prefix
-
     order: list[str] = []
     for b in _firebase_bucket_read_aliases(url_bucket):
         order.append(b)
@@ -318,29 +442,30 @@ def _redact_context_media_src_for_log(src: str, max_len: int = 280) -> str:
     return t
 
 
+_CONTEXT_MEDIA_TYPE_BY_EXT = MappingProxyType(
+    {
+        "png": "image/png",
+        "webp": "image/webp",
+        "gif": "image/gif",
+        "jpg": "image/jpeg",
+        "jpeg": "image/jpeg",
+        "jfif": "image/jpeg",
+        "heic": "image/heic",
+        "heif": "image/heic",
+        "avif": "image/avif",
+        "svg": "image/svg+xml",
+        "mp4": "video/mp4",
+        "webm": "video/webm",
+        "mov": "video/quicktime",
+    }
+)
+
+
 def _media_type_for_context_blob(blob_path: str) -> str:
-    lower = blob_path.lower()
-    if lower.endswith(".png"):
-        return "image/png"
-    if lower.endswith(".webp"):
-        return "image/webp"
-    if lower.endswith(".gif"):
-        return "image/gif"
-    if lower.endswith((".jpg", ".jpeg", ".jfif")):
-        return "image/jpeg"
-    if lower.endswith((".heic", ".heif")):
-        return "image/heic"
-    if lower.endswith(".avif"):
-        return "image/avif"
-    if lower.endswith(".svg"):
-        return "image/svg+xml"
-    if lower.endswith(".mp4"):
-        return "video/mp4"
-    if lower.endswith(".webm"):
-        return "video/webm"
-    if lower.endswith(".mov"):
-        return "video/quicktime"
-    return "application/octet-stream"
+    _, dot, ext = blob_path.rpartition(".")
+    return (
+        _CONTEXT_MEDIA_TYPE_BY_EXT.get(ext.lower(), "application/octet-stream") if dot else "application/octet-stream"
+    )
 
 
 # --- Workflow schemas ---
@@ -403,26 +528,61 @@ class ShareRoleUpdate(BaseModel):
     role: str
 
 
+def _thumbnail_blob_name(gcs_path: str) -> str:
+    """Object name from a ``gs://bucket/blob-name`` thumbnail path."""
+    bucket, _, blob_name = gcs_path.removeprefix("gs://").partition("/")
+    if not gcs_path.startswith("gs://") or not bucket or not blob_name:
+        raise HTTPException(status_code=500, detail="Invalid thumbnail path")
+    return blob_name
+
+
+_THUMBNAIL_URL_TTL_MINUTES = 60
+_THUMBNAIL_URL_REUSE_S = 15 * 60  # a cached URL always has >= 45 minutes of validity left when served
+
+
+@functools.lru_cache(maxsize=4096)
+def _signed_thumbnail_url(blob_name: str, _reuse_window: int) -> str:
+    return generate_signed_read_url(blob_name, expiration_minutes=_THUMBNAIL_URL_TTL_MINUTES)
+
+
 # --- Workflow endpoints ---
 @router.get("")
-async def list_workflows(uid: str = Depends(get_current_uid)):
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
-    # Owned workflows
-    owned_docs = db.collection("workflows").where(filter=FieldFilter("owner_uid", "==", uid)).stream()
+async def list_workflows(
+    uid: str = Depends(get_current_uid),
+    limit: int | None = Query(None, ge=1, le=_MAX_PAGE_SIZE),
+    cursor: str | None = None,
+) -> dict[str, Any]:
+    """List owned and shared workflows; pass ``limit`` (and the returned ``next_cursor``) to page by id."""
+    workflows = get_db().collection("workflows")
+    owned_q = workflows.where(filter=FieldFilter("owner_uid", "==", uid))
+    shared_q = workflows.where(filter=FieldFilter("shared_with", "array_contains", uid))
+    next_cursor: str | None = None
+    # Owned and shared (uid is in the shared_with array) are independent queries; run them concurrently.
+    if limit is None:
+        owned_docs, shared_docs = await asyncio.gather(
+            asyncio.to_thread(list, owned_q.stream()),
+            asyncio.to_thread(list, shared_q.stream()),
+        )
+        docs = [*owned_docs, *shared_docs]
+    else:
+        after_id = _decode_cursor(cursor)["__name__"] if cursor else None
+        owned_docs, shared_docs = await asyncio.gather(
+            asyncio.to_thread(_workflow_id_page, owned_q, after_id, limit),
+            asyncio.to_thread(_workflow_id_page, shared_q, after_id, limit),
+        )
+        # Both pages are id-ordered past the cursor; the first ``limit`` ids of their union are exactly
+        # the next ``limit`` ids overall, so the last one is a safe cursor for both queries.
+        by_id = {d.id: d for d in [*shared_docs, *owned_docs]}
+        docs = [by_id[i] for i in sorted(by_id)[:limit]]
+        if len(by_id) > limit or len(owned_docs) == limit or len(shared_docs) == limit:
+            next_cursor = _encode_cursor({"__name__": docs[-1].id})
     items: dict[str, Any] = {}
-    for d in owned_docs:
-        data = d.to_dict() or {}
-        if data.get("ephemeral") is not True:
-            items[d.id] = {"id": d.id, **data}
-    # Shared workflows (uid is in the shared_with array)
-    shared_docs = db.collection("workflows").where(filter=FieldFilter("shared_with", "array_contains", uid)).stream()
-    for d in shared_docs:
+    for d in docs:
         if d.id not in items:
             data = d.to_dict() or {}
             if data.get("ephemeral") is not True:
                 items[d.id] = {"id": d.id, **data}
-    return {"workflows": list(items.values())}
+    return {"workflows": list(items.values()), "next_cursor": next_cursor}
 
 
 @router.post("")
@@ -430,11 +590,11 @@ async def create_workflow(
     body: WorkflowCreate | None = None,
     uid: str = Depends(get_current_uid),
 ):
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
+    db = get_db()
     workflow_id = str(uuid.uuid4())
     ref = db.collection("workflows").document(workflow_id)
-    ref.set(
+    await asyncio.to_thread(
+        ref.set,
         {
             "owner_uid": uid,
             "name": (body.name if body else None) or "Untitled workflow",
@@ -442,21 +602,21 @@ async def create_workflow(
             "is_public": False,
             "createdAt": SERVER_TIMESTAMP,
             "updatedAt": SERVER_TIMESTAMP,
-        }
+        },
     )
     return {"id": workflow_id}
 
 
 @router.get("/invites")
-async def list_invites(uid: str = Depends(get_current_uid)):
+async def list_invites(uid: str = Depends(get_current_uid)) -> dict[str, Any]:
     """Return pending workflow invites sent to the current user."""
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
-    docs = (
+    db = get_db()
+    docs = await asyncio.to_thread(
+        list,
         db.collection("workflow_invites")
         .where(filter=FieldFilter("to_uid", "==", uid))
         .where(filter=FieldFilter("status", "==", "pending"))
-        .stream()
+        .stream(),
     )
     invites = [{"id": d.id, **d.to_dict()} for d in docs]
     return {"invites": invites}
@@ -466,14 +626,14 @@ async def list_invites(uid: str = Depends(get_current_uid)):
 async def get_workflow(
     workflow_id: str,
     uid: str = Depends(get_current_uid),
-):
-    _, data = _get_workflow(uid, workflow_id, require_owner=False)
+) -> dict[str, Any]:
+    _, data = await asyncio.to_thread(_get_workflow, uid, workflow_id, require_owner=False)
     # Resolve owner display name
     owner_name = None
     owner_uid = data.get("owner_uid")
     if owner_uid:
         try:
-            owner_user = firebase_admin.auth.get_user(owner_uid)
+            owner_user = await asyncio.to_thread(firebase_admin.auth.get_user, owner_uid)
             owner_name = owner_user.display_name or owner_user.email or owner_uid
         except Exception:
             owner_name = owner_uid
@@ -486,7 +646,7 @@ async def update_workflow(
     body: WorkflowUpdate,
     uid: str = Depends(get_current_uid),
 ):
-    wf_ref, data = _get_workflow(uid, workflow_id, require_owner=False)
+    wf_ref, data = await asyncio.to_thread(_get_workflow, uid, workflow_id, require_owner=False, access_only=True)
     _assert_can_edit_workflow(uid, data)
     update: dict[str, Any] = {"updatedAt": SERVER_TIMESTAMP}
     if body.name is not None:
@@ -499,7 +659,7 @@ async def update_workflow(
         if data.get("owner_uid") != uid:
             raise HTTPException(status_code=403, detail="Only the owner can change visibility")
         update["is_public"] = bool(body.is_public)
-    wf_ref.update(update)
+    await asyncio.to_thread(wf_ref.update, update)
     return {"ok": True}
 
 
@@ -510,14 +670,15 @@ async def update_workflow_flow(
     uid: str = Depends(get_current_uid),
 ):
     """Persist Echo Flow canvas state (nodes/edges) on the workflow document."""
-    wf_ref, data = _get_workflow(uid, workflow_id, require_owner=False)
+    wf_ref, data = await asyncio.to_thread(_get_workflow, uid, workflow_id, require_owner=False, access_only=True)
     _assert_can_edit_workflow(uid, data)
-    _validate_flow_graph_step_ids(wf_ref, body.flow_graph)
-    wf_ref.update(
+    await asyncio.to_thread(_validate_flow_graph_step_ids, wf_ref, body.flow_graph)
+    await asyncio.to_thread(
+        wf_ref.update,
         {
             "flow_graph": body.flow_graph,
             "updatedAt": SERVER_TIMESTAMP,
-        }
+        },
     )
     return {"ok": True}
 
@@ -528,18 +689,13 @@ async def get_thumbnail(
     uid: str = Depends(get_current_uid),
 ):
     """Return a short-lived signed URL for the workflow's thumbnail image."""
-    _, data = _get_workflow(uid, workflow_id, require_owner=False)
+    _, data = await asyncio.to_thread(_get_workflow, uid, workflow_id, require_owner=False)
     gcs_path = data.get("thumbnail_gcs_path")
     if not gcs_path:
         raise HTTPException(status_code=404, detail="No thumbnail available")
-    # Parse gs://bucket/blob-name
-    match = re.match(r"gs://[^/]+/(.+)", gcs_path)
-    if not match:
-        raise HTTPException(status_code=500, detail="Invalid thumbnail path")
-    blob_name = match.group(1)
-    from app.services.gcs import generate_signed_read_url
-
-    signed_url = generate_signed_read_url(blob_name, expiration_minutes=60)
+    blob_name = _thumbnail_blob_name(gcs_path)
+    # Signing can mean an IAM signBlob RPC; reuse one URL per blob per window (also keeps browser caches warm).
+    signed_url = await asyncio.to_thread(_signed_thumbnail_url, blob_name, int(time.time() // _THUMBNAIL_URL_REUSE_S))
     return {"url": signed_url}
 
 
@@ -554,18 +710,13 @@ async def get_thumbnail_image(
     Use this from the web app with Bearer auth + blob URLs so thumbnails load in production
     without relying on browser loads of GCS signed URLs (Referrer/CORP/CORS edge cases).
     """
-    _, data = _get_workflow(uid, workflow_id, require_owner=False)
+    _, data = await asyncio.to_thread(_get_workflow, uid, workflow_id, require_owner=False)
     gcs_path = data.get("thumbnail_gcs_path")
     if not gcs_path:
         raise HTTPException(status_code=404, detail="No thumbnail available")
-    match = re.match(r"gs://[^/]+/(.+)", gcs_path)
-    if not match:
-        raise HTTPException(status_code=500, detail="Invalid thumbnail path")
-    blob_name = match.group(1)
-    from app.services.gcs import download_file
-
+    blob_name = _thumbnail_blob_name(gcs_path)
     try:
-        body = download_file(blob_name)
+        body = await asyncio.to_thread(download_file, blob_name)
     except gcp_exceptions.NotFound as e:
         raise HTTPException(status_code=404, detail="Thumbnail blob not found") from e
     except Exception as e:
@@ -606,7 +757,7 @@ async def post_context_media(
         redacted_src,
     )
     try:
-        _, data = _get_workflow(uid, workflow_id, require_owner=False)
+        _, data = await asyncio.to_thread(_get_workflow, uid, workflow_id, require_owner=False)
     except HTTPException as e:
         if e.status_code == 404:
             _log.warning(
@@ -675,7 +826,9 @@ async def post_context_media(
         )
 
     try:
-        raw, resolved_bucket = _download_context_media_bytes(req_id, workflow_id, bucket, blob_path)
+        raw, resolved_bucket = await asyncio.to_thread(
+            _download_context_media_bytes, req_id, workflow_id, bucket, blob_path
+        )
     except gcp_exceptions.NotFound:
         tail = blob_path[-240:] if len(blob_path) > 240 else blob_path
         _log.warning(
@@ -726,7 +879,7 @@ async def share_workflow(
     uid: str = Depends(get_current_uid),
 ):
     """Send a workflow invite to another user by email. Owner or collaborator with editor role."""
-    wf_ref, wf_data = _get_workflow(uid, workflow_id, require_owner=False)
+    wf_ref, wf_data = await asyncio.to_thread(_get_workflow, uid, workflow_id, require_owner=False)
     _assert_can_edit_workflow(uid, wf_data)
     if wf_data.get("is_public") is not True:
         raise HTTPException(
@@ -734,7 +887,7 @@ async def share_workflow(
             detail="Make this workflow public before inviting people or sharing the link.",
         )
     try:
-        target_user = firebase_admin.auth.get_user_by_email(body.email)
+        target_user = await asyncio.to_thread(firebase_admin.auth.get_user_by_email, body.email)
     except firebase_admin.auth.UserNotFoundError:
         raise HTTPException(status_code=404, detail="No Echo account found for that email")
     if body.role not in ("viewer", "editor"):
@@ -744,21 +897,21 @@ async def share_workflow(
     if target_user.uid in (wf_data.get("shared_with") or []):
         raise HTTPException(status_code=400, detail="User already has access")
     # Prevent duplicate pending invites
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
-    existing = list(
+    db = get_db()
+    existing = await asyncio.to_thread(
+        list,
         db.collection("workflow_invites")
         .where(filter=FieldFilter("workflow_id", "==", workflow_id))
         .where(filter=FieldFilter("to_uid", "==", target_user.uid))
         .where(filter=FieldFilter("status", "==", "pending"))
         .limit(1)
-        .stream()
+        .stream(),
     )
     if existing:
         raise HTTPException(status_code=400, detail="Invite already sent to this user")
     # Resolve sender display name and photo (for in-app notifications)
     try:
-        sender = firebase_admin.auth.get_user(uid)
+        sender = await asyncio.to_thread(firebase_admin.auth.get_user, uid)
         from_name = sender.display_name or sender.email or uid
         from_photo = getattr(sender, "photo_url", None) or ""
         if not isinstance(from_photo, str):
@@ -767,7 +920,8 @@ async def share_workflow(
         from_name = uid
         from_photo = ""
     invite_ref = db.collection("workflow_invites").document()
-    invite_ref.set(
+    await asyncio.to_thread(
+        invite_ref.set,
         {
             "workflow_id": workflow_id,
             "workflow_name": wf_data.get("name", "Untitled workflow"),
@@ -778,12 +932,13 @@ async def share_workflow(
             "role": body.role,
             "status": "pending",
             "createdAt": SERVER_TIMESTAMP,
-        }
+        },
     )
     # Create a notification for the recipient so they see it on the notifications page
     workflow_name = wf_data.get("name", "Untitled workflow")
     notif_ref = db.collection("notifications").document()
-    notif_ref.set(
+    await asyncio.to_thread(
+        notif_ref.set,
         {
             "to_uid": target_user.uid,
             "type": "workflow_shared",
@@ -797,15 +952,16 @@ async def share_workflow(
             "invite_id": invite_ref.id,
             "read": False,
             "createdAt": SERVER_TIMESTAMP,
-        }
+        },
     )
     # Make invitees appear immediately in the owner's "Shared with" list.
-    wf_ref.update(
+    await asyncio.to_thread(
+        wf_ref.update,
         {
             "shared_with": ArrayUnion([target_user.uid]),
             f"collaborator_roles.{target_user.uid}": body.role,
             "updatedAt": SERVER_TIMESTAMP,
-        }
+        },
     )
     return {"ok": True, "invite_id": invite_ref.id}
 
@@ -819,15 +975,15 @@ async def accept_invite(
 
     Use POST /workflows/{id}/fork to create a separate owned copy when desired.
     """
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
-    invites = list(
+    db = get_db()
+    invites = await asyncio.to_thread(
+        list,
         db.collection("workflow_invites")
         .where(filter=FieldFilter("workflow_id", "==", workflow_id))
         .where(filter=FieldFilter("to_uid", "==", uid))
         .where(filter=FieldFilter("status", "==", "pending"))
         .limit(1)
-        .stream()
+        .stream(),
     )
     if not invites:
         raise HTTPException(status_code=404, detail="No pending invite found")
@@ -835,25 +991,26 @@ async def accept_invite(
     invite_ref = invite_snap.reference
     invite_data = invite_snap.to_dict() or {}
     wf_ref = db.collection("workflows").document(workflow_id)
-    wf_doc = wf_ref.get()
+    wf_doc = await asyncio.to_thread(wf_ref.get)
     if not wf_doc.exists:
         raise HTTPException(status_code=404, detail="Source workflow no longer exists")
     wf_data = wf_doc.to_dict() or {}
     # Owner invite usually already added the recipient to shared_with; repair if missing.
     if uid not in (wf_data.get("shared_with") or []):
         role = invite_data.get("role") if invite_data.get("role") in ("viewer", "editor") else "editor"
-        wf_ref.update(
+        await asyncio.to_thread(
+            wf_ref.update,
             {
                 "shared_with": ArrayUnion([uid]),
                 f"collaborator_roles.{uid}": role,
                 "updatedAt": SERVER_TIMESTAMP,
-            }
+            },
         )
-    invite_ref.update({"status": "accepted"})
+    await asyncio.to_thread(invite_ref.update, {"status": "accepted"})
     owner_uid = wf_data.get("owner_uid")
     if isinstance(owner_uid, str) and owner_uid and owner_uid != uid:
         try:
-            accepter = firebase_admin.auth.get_user(uid)
+            accepter = await asyncio.to_thread(firebase_admin.auth.get_user, uid)
             accepter_name = accepter.display_name or accepter.email or uid
             accepter_photo = getattr(accepter, "photo_url", None) or ""
             if not isinstance(accepter_photo, str):
@@ -863,7 +1020,8 @@ async def accept_invite(
             accepter_photo = ""
         wf_name = wf_data.get("name", "Untitled workflow")
         owner_notif = db.collection("notifications").document()
-        owner_notif.set(
+        await asyncio.to_thread(
+            owner_notif.set,
             {
                 "to_uid": owner_uid,
                 "type": "invite_accepted",
@@ -876,7 +1034,7 @@ async def accept_invite(
                 "from_photo_url": accepter_photo,
                 "read": False,
                 "createdAt": SERVER_TIMESTAMP,
-            }
+            },
         )
     return {"ok": True, "workflow_id": workflow_id}
 
@@ -887,28 +1045,29 @@ async def decline_invite(
     uid: str = Depends(get_current_uid),
 ):
     """Decline a pending workflow invite. Recipient only."""
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
-    invites = list(
+    db = get_db()
+    invites = await asyncio.to_thread(
+        list,
         db.collection("workflow_invites")
         .where(filter=FieldFilter("workflow_id", "==", workflow_id))
         .where(filter=FieldFilter("to_uid", "==", uid))
         .where(filter=FieldFilter("status", "==", "pending"))
         .limit(1)
-        .stream()
+        .stream(),
     )
     if not invites:
         raise HTTPException(status_code=404, detail="No pending invite found")
     invite = invites[0]
-    invite.reference.update({"status": "declined"})
+    await asyncio.to_thread(invite.reference.update, {"status": "declined"})
     # If the inviter granted immediate visibility/access, remove it on decline.
     wf_ref = db.collection("workflows").document(workflow_id)
-    wf_ref.update(
+    await asyncio.to_thread(
+        wf_ref.update,
         {
             "shared_with": ArrayRemove([uid]),
             f"collaborator_roles.{uid}": DELETE_FIELD,
             "updatedAt": SERVER_TIMESTAMP,
-        }
+        },
     )
     return {"ok": True}
 
@@ -923,15 +1082,16 @@ async def update_share_role(
     """Change a collaborator's role (owner only)."""
     if body.role not in ("viewer", "editor"):
         raise HTTPException(status_code=400, detail="role must be viewer or editor")
-    wf_ref, wf_data = _get_workflow(uid, workflow_id)
+    wf_ref, wf_data = await asyncio.to_thread(_get_workflow, uid, workflow_id)
     shared = wf_data.get("shared_with") or []
     if target_uid not in shared:
         raise HTTPException(status_code=404, detail="User is not a collaborator on this workflow")
-    wf_ref.update(
+    await asyncio.to_thread(
+        wf_ref.update,
         {
             f"collaborator_roles.{target_uid}": body.role,
             "updatedAt": SERVER_TIMESTAMP,
-        }
+        },
     )
     return {"ok": True}
 
@@ -942,10 +1102,9 @@ async def leave_workflow(
     uid: str = Depends(get_current_uid),
 ):
     """Remove yourself as a collaborator (non-owners only)."""
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
+    db = get_db()
     wf_ref = db.collection("workflows").document(workflow_id)
-    wf_doc = wf_ref.get()
+    wf_doc = await asyncio.to_thread(wf_ref.get)
     if not wf_doc.exists:
         raise HTTPException(status_code=404, detail="Workflow not found")
     wf_data = wf_doc.to_dict() or {}
@@ -958,12 +1117,13 @@ async def leave_workflow(
     shared = wf_data.get("shared_with") or []
     if uid not in shared:
         raise HTTPException(status_code=404, detail="You are not a collaborator on this workflow")
-    wf_ref.update(
+    await asyncio.to_thread(
+        wf_ref.update,
         {
             "shared_with": ArrayRemove([uid]),
             f"collaborator_roles.{uid}": DELETE_FIELD,
             "updatedAt": SERVER_TIMESTAMP,
-        }
+        },
     )
     pending_invites = (
         db.collection("workflow_invites")
@@ -972,8 +1132,12 @@ async def leave_workflow(
         .where(filter=FieldFilter("status", "==", "pending"))
         .stream()
     )
-    for inv in pending_invites:
-        inv.reference.delete()
+    stale_invites = await asyncio.to_thread(list, pending_invites)
+    if stale_invites:
+        batch = db.batch()
+        for inv in stale_invites:
+            batch.delete(inv.reference)
+        await asyncio.to_thread(batch.commit)
     return {"ok": True}
 
 
@@ -984,15 +1148,15 @@ async def unshare_workflow(
     uid: str = Depends(get_current_uid),
 ):
     """Remove a user's access to a shared workflow. Owner only."""
-    wf_ref, _ = _get_workflow(uid, workflow_id)
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
-    wf_ref.update(
+    wf_ref, _ = await asyncio.to_thread(_get_workflow, uid, workflow_id, access_only=True)
+    db = get_db()
+    await asyncio.to_thread(
+        wf_ref.update,
         {
             "shared_with": ArrayRemove([target_uid]),
             f"collaborator_roles.{target_uid}": DELETE_FIELD,
             "updatedAt": SERVER_TIMESTAMP,
-        }
+        },
     )
     # Also remove pending invites so the collaborator cannot reappear as "pending".
     pending_invites = (
@@ -1002,8 +1166,12 @@ async def unshare_workflow(
         .where(filter=FieldFilter("status", "==", "pending"))
         .stream()
     )
-    for invite_doc in pending_invites:
-        invite_doc.reference.delete()
+    stale_invites = await asyncio.to_thread(list, pending_invites)
+    if stale_invites:
+        batch = db.batch()
+        for invite_doc in stale_invites:
+            batch.delete(invite_doc.reference)
+        await asyncio.to_thread(batch.commit)
     return {"ok": True}
 
 
@@ -1013,9 +1181,8 @@ async def get_collaborators(
     uid: str = Depends(get_current_uid),
 ):
     """Return the list of users the workflow is shared with."""
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
-    _, data = _get_workflow(uid, workflow_id, require_owner=False)
+    db = get_db()
+    _, data = await asyncio.to_thread(_get_workflow, uid, workflow_id, require_owner=False)
     is_owner = data.get("owner_uid") == uid
     shared_uids: list[str] = data.get("shared_with") or []
     is_editor = uid in shared_uids and _collaborator_role(data, uid) == "editor"
@@ -1027,7 +1194,7 @@ async def get_collaborators(
             .where(filter=FieldFilter("status", "==", "pending"))
             .stream()
         )
-        for invite in pending_invites:
+        for invite in await asyncio.to_thread(list, pending_invites):
             invite_data = invite.to_dict() or {}
             invite_uid = invite_data.get("to_uid")
             if isinstance(invite_uid, str) and invite_uid:
@@ -1059,7 +1226,7 @@ async def get_collaborators(
             role_out = _collaborator_role(data, uid_row)
         status = "pending" if uid_row in pending_uids else "accepted"
         try:
-            user = firebase_admin.auth.get_user(uid_row)
+            user = await asyncio.to_thread(firebase_admin.auth.get_user, uid_row)
             photo = getattr(user, "photo_url", None)
             collaborators.append(
                 {
@@ -1092,9 +1259,8 @@ async def fork_workflow(
 ):
     """Create a copy of a workflow (owned by or shared with the caller)."""
     # Allow shared users to fork
-    _, data = _get_workflow(uid, workflow_id, require_owner=False)
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
+    _, data = await asyncio.to_thread(_get_workflow, uid, workflow_id, require_owner=False)
+    db = get_db()
     new_id = str(uuid.uuid4())
     new_ref = db.collection("workflows").document(new_id)
     base_name = (data.get("name") or "Untitled") or "Untitled"
@@ -1110,12 +1276,8 @@ async def fork_workflow(
     }
     if data.get("flow_graph") is not None:
         fork_payload["flow_graph"] = data.get("flow_graph")
-    new_ref.set(fork_payload)
-    # Copy all steps
     old_ref = db.collection("workflows").document(workflow_id)
-    for step_doc in old_ref.collection("steps").order_by("order").stream():
-        step_data = step_doc.to_dict() or {}
-        new_ref.collection("steps").document(str(uuid.uuid4())).set(step_data)
+    await asyncio.to_thread(_write_fork, db, old_ref, new_ref, fork_payload)
     return {"id": new_id}
 
 
@@ -1124,11 +1286,8 @@ async def delete_workflow(
     workflow_id: str,
     uid: str = Depends(get_current_uid),
 ):
-    wf_ref, _ = _get_workflow(uid, workflow_id)
-    # Delete steps first
-    for step in wf_ref.collection("steps").stream():
-        step.reference.delete()
-    wf_ref.delete()
+    wf_ref, _ = await asyncio.to_thread(_get_workflow, uid, workflow_id, access_only=True)
+    await asyncio.to_thread(_delete_workflow_and_steps, wf_ref)
     return {"ok": True}
 
 
@@ -1137,12 +1296,24 @@ async def delete_workflow(
 async def list_steps(
     workflow_id: str,
     uid: str = Depends(get_current_uid),
-):
-    wf_ref, _ = _get_workflow(uid, workflow_id, require_owner=False)
+    limit: int | None = Query(None, ge=1, le=_MAX_PAGE_SIZE),
+    cursor: str | None = None,
+) -> dict[str, Any]:
+    """List steps in ``order``; pass ``limit`` (and the returned ``next_cursor``) to page through them."""
+    wf_ref, _ = await asyncio.to_thread(_get_workflow, uid, workflow_id, require_owner=False, access_only=True)
+    q = wf_ref.collection("steps").order_by("order").order_by("__name__")
+    if cursor:
+        values = _decode_cursor(cursor)
+        q = q.start_after({"order": values.get("order"), "__name__": values["__name__"]})
+    if limit is not None:
+        q = q.limit(limit)
     steps = []
-    for d in wf_ref.collection("steps").order_by("order").stream():
+    for d in await asyncio.to_thread(list, q.stream()):
         steps.append({"id": d.id, **d.to_dict()})
-    return {"steps": steps}
+    next_cursor = None
+    if limit is not None and len(steps) == limit:
+        next_cursor = _encode_cursor({"order": steps[-1].get("order"), "__name__": steps[-1]["id"]})
+    return {"steps": steps, "next_cursor": next_cursor}
 
 
 @router.post("/{workflow_id}/steps")
@@ -1151,7 +1322,7 @@ async def create_step(
     body: StepCreate,
     uid: str = Depends(get_current_uid),
 ):
-    wf_ref, data = _get_workflow(uid, workflow_id, require_owner=False)
+    wf_ref, data = await asyncio.to_thread(_get_workflow, uid, workflow_id, require_owner=False, access_only=True)
     _assert_can_edit_workflow(uid, data)
     steps_col = wf_ref.collection("steps")
     step_id = str(uuid.uuid4())
@@ -1168,14 +1339,13 @@ async def create_step(
     if body.context_attachments is not None:
         step_payload["context_attachments"] = body.context_attachments
 
-    app = get_firebase_app()
-    db = firebase_admin.firestore.client(app)
+    db = get_db()
     batch = db.batch()
 
     insert_before = (body.insert_before_step_id or "").strip()
     placed = False
     if insert_before:
-        ordered_docs = list(steps_col.order_by("order").stream())
+        ordered_docs = await asyncio.to_thread(list, steps_col.order_by("order").stream())
         sorted_ids = [d.id for d in ordered_docs]
         if insert_before in sorted_ids:
             i = sorted_ids.index(insert_before)
@@ -1186,13 +1356,13 @@ async def create_step(
             placed = True
 
     if not placed:
-        existing = list(steps_col.order_by("order", direction="DESCENDING").limit(1).stream())
+        existing = await asyncio.to_thread(list, steps_col.order_by("order", direction="DESCENDING").limit(1).stream())
         next_order = (existing[0].to_dict().get("order", -1) + 1) if existing else 0
         step_payload["order"] = next_order
         batch.set(steps_col.document(step_id), step_payload)
 
     batch.update(wf_ref, {"updatedAt": SERVER_TIMESTAMP})
-    batch.commit()
+    await asyncio.to_thread(batch.commit)
     return {"id": step_id}
 
 
@@ -1203,12 +1373,7 @@ async def update_step(
     body: StepUpdate,
     uid: str = Depends(get_current_uid),
 ):
-    wf_ref, data = _get_workflow(uid, workflow_id, require_owner=False)
-    _assert_can_edit_workflow(uid, data)
-    step_ref = wf_ref.collection("steps").document(step_id)
-    doc = step_ref.get()
-    if not doc.exists:
-        raise HTTPException(status_code=404, detail="Step not found")
+    wf_ref, step_ref = await asyncio.to_thread(_get_workflow_and_step, uid, workflow_id, step_id)
     update: dict[str, Any] = {}
     if body.action is not None:
         update["action"] = body.action
@@ -1227,8 +1392,10 @@ async def update_step(
     if body.context_attachments is not None:
         update["context_attachments"] = body.context_attachments
     if update:
-        step_ref.update(update)
-        wf_ref.update({"updatedAt": SERVER_TIMESTAMP})
+        batch = get_db().batch()
+        batch.update(step_ref, update)
+        batch.update(wf_ref, {"updatedAt": SERVER_TIMESTAMP})
+        await asyncio.to_thread(batch.commit)
     return {"ok": True}
 
 
@@ -1238,12 +1405,9 @@ async def delete_step(
     step_id: str,
     uid: str = Depends(get_current_uid),
 ):
-    wf_ref, data = _get_workflow(uid, workflow_id, require_owner=False)
-    _assert_can_edit_workflow(uid, data)
-    step_ref = wf_ref.collection("steps").document(step_id)
-    doc = step_ref.get()
-    if not doc.exists:
-        raise HTTPException(status_code=404, detail="Step not found")
-    step_ref.delete()
-    wf_ref.update({"updatedAt": SERVER_TIMESTAMP})
+    wf_ref, step_ref = await asyncio.to_thread(_get_workflow_and_step, uid, workflow_id, step_id)
+    batch = get_db().batch()
+    batch.delete(step_ref)
+    batch.update(wf_ref, {"updatedAt": SERVER_TIMESTAMP})
+    await asyncio.to_thread(batch.commit)
     return {"ok": True}
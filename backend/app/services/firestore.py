@@ -0,0 +1,13 @@
+"""Process-wide Firestore client shared by the API routers."""
+
+import functools
+
+import firebase_admin.firestore
+
+from app.auth import get_firebase_app
+
+
+@functools.lru_cache(maxsize=1)
+def get_db():
+    """Sync Firestore client for the default Firebase app, created on first use and reused after."""
+    return firebase_admin.firestore.client(get_firebase_app())
@@ -1,10 +1,14 @@
 import datetime
 import os
+from typing import BinaryIO
 
 from google.cloud import storage
 
 from app.config import GCS_BUCKET, GOOGLE_APPLICATION_CREDENTIALS
 
+# Resumable upload chunk (must be a multiple of 256 KiB); bounds memory per streamed upload.
+_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
 
 def get_bucket():
     if not GCS_BUCKET:
@@ -24,12 +28,49 @@ def upload_file(
     return f"gs://{GCS_BUCKET}/{blob_name}"
 
 
+def upload_fileobj(
+    blob_name: str,
+    fileobj: BinaryIO,
+    content_type: str | None = None,
+) -> str:
+    """Stream a file-like object to GCS with a chunked resumable upload (never reads it fully into memory).
+
+    CRC32C is accumulated chunk by chunk as bytes are sent and checked against the stored object;
+    a mismatch raises ``DataCorruption`` and the partial object is deleted.
+    """
+    bucket = get_bucket()
+    blob = bucket.blob(blob_name, chunk_size=_UPLOAD_CHUNK_SIZE)
+    blob.upload_from_file(fileobj, content_type=content_type, rewind=True, checksum="crc32c")
+    return f"gs://{GCS_BUCKET}/{blob_name}"
+
+
+def copy_blob(src_blob_name: str, dest_blob_name: str) -> str:
+    """Server-side copy within the configured bucket; no object bytes pass through this process.
+
+    Uses the Rewrite API, which may finish large objects over several calls (resumed via token)
+    where a single copy request can time out.
+    """
+    bucket = get_bucket()
+    src = bucket.blob(src_blob_name)
+    dest = bucket.blob(dest_blob_name)
+    token, _, _ = dest.rewrite(src)
+    while token is not None:
+        token, _, _ = dest.rewrite(src, token=token)
+    return f"gs://{GCS_BUCKET}/{dest_blob_name}"
+
+
 def download_file(blob_name: str) -> bytes:
     bucket = get_bucket()
     blob = bucket.blob(blob_name)
     return blob.download_as_bytes()
 
 
+def download_to_filename(blob_name: str, path: str) -> None:
+    """Stream a blob to a local file (chunked; the object is never held in memory)."""
+    bucket = get_bucket()
+    bucket.blob(blob_name).download_to_filename(path)
+
+
 def download_from_bucket(bucket_name: str, blob_name: str) -> bytes:
     """Read bytes from an arbitrary GCS bucket (e.g. Firebase Storage bucket != ECHO_GCS_BUCKET)."""
     if not bucket_name or not blob_name:
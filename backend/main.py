@@ -1,4 +1,10 @@
-from app.config import CORS_ORIGINS
+import asyncio
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio.to_thread
+from app.body_limit import MAX_PROXIED_UPLOAD_BYTES, BodySizeLimitMiddleware
+from app.config import BLOCKING_IO_THREADS, CORS_ORIGINS
 from app.routers import (
     composio,
     datasets,
@@ -16,8 +22,20 @@ from app.routers import (
 )
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+
+
+@contextlib.asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    # Routers offload sync Firestore/GCS calls with asyncio.to_thread, which uses the loop's default executor.
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=BLOCKING_IO_THREADS, thread_name_prefix="blocking-io")
+    )
+    anyio.to_thread.current_default_thread_limiter().total_tokens = BLOCKING_IO_THREADS
+    yield
 
-app = FastAPI(title="Echo API", version="0.1.0")
+
+app = FastAPI(title="Echo API", version="0.1.0", lifespan=_lifespan)
 
 _origins = [o.strip() for o in CORS_ORIGINS.split(",") if o.strip()]
 
@@ -27,6 +45,8 @@ _origin_regex = (
 )
 if not _origins:
     _origins = ["http://localhost:3000", "http://127.0.0.1:3000"]  # dev defaults
+# Added before CORS so CORS stays outermost and 413s still carry CORS headers.
+app.add_middleware(BodySizeLimitMiddleware, max_bytes=MAX_PROXIED_UPLOAD_BYTES, paths=("/api/storage/upload",))
 app.add_middleware(
     CORSMiddleware,
     allow_origins=_origins,
@@ -36,17 +56,40 @@ app.add_middleware(
     allow_headers=["*"],
     expose_headers=["*"],
 )
+# Compresses JSON responses (workflow/step/run lists); Starlette leaves text/event-stream uncompressed.
+app.add_middleware(GZipMiddleware, minimum_size=500)
+
+_ROUTERS = (
+    (health.router, ""),
+    (storage.router, "/api"),
+    (users.router, "/api"),
+    (workflows.router, "/api"),
+    (runs.router, "/api"),
+    (schedule.router, "/api"),
+    (session_sse.router, "/api"),
+    (stream.router, "/api"),
+    (mcp_tools.router, "/api"),
+    (integrations.router, "/api"),
+    (composio.router, "/api"),
+    (datasets.router, "/api"),
+    (notifications.router, "/api"),
+)
+
+
+def _assert_unique_routes() -> None:
+    """Fail at import if two handlers claim the same (method, path); Starlette would silently shadow one."""
+    seen: dict[tuple[str, str], str] = {}
+    for router, prefix in _ROUTERS:
+        for route in router.routes:
+            path = prefix + getattr(route, "path", "")
+            for method in getattr(route, "methods", None) or ():
+                key = (method, path)
+                name = f"{route.endpoint.__module__}.{route.endpoint.__name__}"
+                if key in seen:
+                    raise RuntimeError(f"Duplicate route {method} {path}: {seen[key]} and {name}")
+                seen[key] = name
+
 
-app.include_router(health.router)
-app.include_router(storage.router, prefix="/api")
-app.include_router(users.router, prefix="/api")
-app.include_router(workflows.router, prefix="/api")
-app.include_router(runs.router, prefix="/api")
-app.include_router(schedule.router, prefix="/api")
-app.include_router(session_sse.router, prefix="/api")
-app.include_router(stream.router, prefix="/api")
-app.include_router(mcp_tools.router, prefix="/api")
-app.include_router(integrations.router, prefix="/api")
-app.include_router(composio.router, prefix="/api")
-app.include_router(datasets.router, prefix="/api")
-app.include_router(notifications.router, prefix="/api")
+_assert_unique_routes()
+for _router, _prefix in _ROUTERS:
+    app.include_router(_router, prefix=_prefix)